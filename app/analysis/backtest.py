@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+from config import BACKTEST_COST_BPS
+from utils.constants import TECHNICAL_INDICATORS as SIGNAL_THRESHOLDS
+from utils.helpers import calculate_sharpe_ratio, calculate_max_drawdown, calculate_calmar_ratio
+from analysis.indicators import compute_indicators, SMA_SHORT, SMA_LONG
+
+RULES = ['RSI', 'MACD', 'MA', 'BB']
+
+RSI_OVERBOUGHT = SIGNAL_THRESHOLDS['RSI']['overbought']
+RSI_OVERSOLD = SIGNAL_THRESHOLDS['RSI']['oversold']
+
+
+def rule_signals(close, indicators, rule):
+    """
+    Evaluate one get_trading_signals rule over every bar and symbol.
+
+    Returns a (time x symbols) array of +1 (bullish / oversold), -1
+    (bearish / overbought) or 0 where the rule gives no signal.
+    """
+    with np.errstate(invalid='ignore'):
+        if rule == 'RSI':
+            rsi = indicators['RSI']
+            long, short = rsi < RSI_OVERSOLD, rsi > RSI_OVERBOUGHT
+        elif rule == 'MACD':
+            macd, signal = indicators['MACD'], indicators['MACD_Signal']
+            long, short = macd > signal, macd <= signal
+        elif rule == 'MA':
+            sma_short, sma_long = indicators[SMA_SHORT], indicators[SMA_LONG]
+            long = (close > sma_short) & (sma_short > sma_long)
+            short = (close < sma_short) & (sma_short < sma_long)
+        elif rule == 'BB':
+            long, short = close < indicators['BB_Lower'], close > indicators['BB_Upper']
+        else:
+            raise ValueError(f"Unknown rule '{rule}', expected one of {RULES + ['combined']}")
+    return long.astype(np.int8) - short.astype(np.int8)
+
+
+def hold_positions(signals):
+    """
+    Forward-fill non-zero signals down each column, so a position is held
+    until the opposite signal; bars before the first signal are flat
+    """
+    rows = np.arange(len(signals))[:, None]
+    idx = np.where(signals != 0, rows, -1)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    held = np.take_along_axis(signals, np.maximum(idx, 0), axis=0)
+    return np.where(idx >= 0, held, 0).astype(float)
+
+
+def strategy_positions(close, rule='combined', long_only=True, indicators=None):
+    """
+    Target positions per bar and symbol for a rule, or for 'combined', the
+    majority vote of all rules' held positions
+    """
+    close = np.asarray(close, dtype=float)
+    if indicators is None:
+        indicators = compute_indicators(close)
+
+    if rule == 'combined':
+        votes = sum(hold_positions(rule_signals(close, indicators, name)) for name in RULES)
+        positions = np.sign(votes)
+    else:
+        positions = hold_positions(rule_signals(close, indicators, rule))
+
+    if long_only:
+        positions = np.maximum(positions, 0.0)
+    return positions
+
+
+def strategy_returns(close, positions, cost_bps=BACKTEST_COST_BPS):
+    """
+    Per-bar strategy returns and turnover for target positions: positions
+    earn the next bar's return and each change costs cost_bps per unit
+    """
+    asset_returns = np.zeros_like(close)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        asset_returns[1:] = close[1:] / close[:-1] - 1.0
+    asset_returns[~np.isfinite(asset_returns)] = 0.0
+
+    held = np.zeros_like(positions)
+    held[1:] = positions[:-1]
+    turnover = np.abs(np.diff(positions, axis=0, prepend=0.0))
+    return held * asset_returns - turnover * cost_bps / 10000.0, turnover
+
+
+def portfolio_stats(returns, risk_free_rate=0.02):
+    """
+    Summary of a return series: total and annual return, Sharpe, max
+    drawdown and Calmar ratio
+    """
+    return {
+        'total_return': float(((1 + returns).prod() - 1) * 100),
+        'annual_return': float(returns.mean() * 252 * 100),
+        'sharpe_ratio': float(calculate_sharpe_ratio(returns, risk_free_rate)),
+        'max_drawdown': float(calculate_max_drawdown(returns) * 100),
+        'calmar_ratio': float(calculate_calmar_ratio(returns))
+    }
+
+
+def backtest(prices, rule='combined', cost_bps=BACKTEST_COST_BPS, long_only=True, risk_free_rate=0.02):
+    """
+    Backtest a signal rule over a close-price panel (dates x symbols).
+
+    Positions are taken at the close of the signal bar and earn the next
+    bar's return. Each change in position costs cost_bps basis points per
+    unit traded. Everything is computed as whole-array operations.
+
+    Returns {'positions', 'returns', 'equity', 'stats', 'portfolio'}: the
+    first three are DataFrames shaped like prices, stats has one row per
+    symbol and portfolio summarizes the equal-weighted strategy.
+    """
+    prices = prices.sort_index()
+    close = prices.to_numpy(dtype=float)
+    positions = strategy_positions(close, rule=rule, long_only=long_only)
+    returns, turnover = strategy_returns(close, positions, cost_bps)
+
+    returns = pd.DataFrame(returns, index=prices.index, columns=prices.columns)
+    positions = pd.DataFrame(positions, index=prices.index, columns=prices.columns)
+    equity = (1 + returns).cumprod()
+
+    stats = pd.DataFrame({
+        'total_return': (equity.iloc[-1] - 1) * 100 if len(equity) else 0.0,
+        'annual_return': returns.mean() * 252 * 100,
+        'volatility': returns.std() * np.sqrt(252) * 100,
+        'sharpe_ratio': calculate_sharpe_ratio(returns, risk_free_rate),
+        'max_drawdown': calculate_max_drawdown(returns) * 100,
+        'calmar_ratio': calculate_calmar_ratio(returns),
+        'trades': pd.Series(np.count_nonzero(turnover, axis=0), index=prices.columns),
+        'exposure': positions.abs().mean() * 100
+    })
+
+    return {
+        'positions': positions,
+        'returns': returns,
+        'equity': equity,
+        'stats': stats,
+        'portfolio': portfolio_stats(returns.mean(axis=1), risk_free_rate)
+    }
+
+
+def compare_rules(prices, rules=None, **kwargs):
+    """
+    Backtest each rule (and the combined vote) and return the portfolio
+    summary of each as a DataFrame
+    """
+    rules = rules or RULES + ['combined']
+    return pd.DataFrame({rule: backtest(prices, rule=rule, **kwargs)['portfolio'] for rule in rules}).T
@@ -0,0 +1,237 @@
+import math
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config import CORRELATION_METHOD, CORRELATION_HALFLIFE, CORRELATION_WINDOW, CORRELATION_DTYPE
+
+
+class MomentSnapshot:
+    """
+    Immutable view of the moments after one update.
+
+    Arrays are read-only and never modified after publication, so readers
+    can hold on to them (or wrap them in DataFrames) without copying. The
+    correlation matrix is derived lazily on first access.
+    """
+
+    __slots__ = ('symbols', 'version', 'timestamp', 'count', 'mean', 'covariance', '_correlation', '_index')
+
+    def __init__(self, symbols, version, timestamp, count, mean, covariance):
+        mean.flags.writeable = False
+        covariance.flags.writeable = False
+        self.symbols = tuple(symbols)
+        self.version = version
+        self.timestamp = timestamp
+        self.count = count
+        self.mean = mean
+        self.covariance = covariance
+        self._correlation = None
+        self._index = None
+
+    @property
+    def correlation(self):
+        if self._correlation is None:
+            std = np.sqrt(np.maximum(np.diag(self.covariance), 0))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                correlation = self.covariance / np.outer(std, std)
+            correlation[~np.isfinite(correlation)] = 0.0
+            np.clip(correlation, -1.0, 1.0, out=correlation)
+            np.fill_diagonal(correlation, 1.0)
+            correlation.flags.writeable = False
+            self._correlation = correlation
+        return self._correlation
+
+    def _select(self, matrix, symbols):
+        if symbols is None:
+            return pd.DataFrame(matrix, index=list(self.symbols), columns=list(self.symbols), copy=False)
+        if self._index is None:
+            self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        positions = [self._index[symbol] for symbol in symbols]
+        return pd.DataFrame(matrix[np.ix_(positions, positions)], index=list(symbols), columns=list(symbols))
+
+    def covariance_frame(self, symbols=None):
+        """
+        Per-bar covariance as a DataFrame; the full matrix is not copied
+        """
+        return self._select(self.covariance, symbols)
+
+    def correlation_frame(self, symbols=None):
+        """
+        Correlation as a DataFrame; the full matrix is not copied
+        """
+        return self._select(self.correlation, symbols)
+
+
+class MomentEngine:
+    """
+    Incrementally maintained mean and covariance of returns for a fixed set
+    of symbols, either exponentially weighted ('ewma') or over a fixed
+    window of bars ('window'). Each update costs O(N^2).
+
+    Missing returns are treated as zero. After each update (or each batch
+    of updates) a new MomentSnapshot is published by swapping one reference.
+    """
+
+    # Recompute the window sums from the buffer every so often to stop
+    # floating point drift, which builds up quickly in float32
+    RESYNC_EVERY = 1000
+
+    def __init__(self, symbols, method=CORRELATION_METHOD, halflife=CORRELATION_HALFLIFE,
+                 window=CORRELATION_WINDOW, dtype=CORRELATION_DTYPE, min_periods=20):
+        if method not in ('ewma', 'window'):
+            raise ValueError(f"Unknown moment method '{method}', expected 'ewma' or 'window'")
+        self.symbols = list(symbols)
+        self.method = method
+        self.halflife = halflife
+        self.window = window
+        self.dtype = np.dtype(dtype)
+        self.min_periods = min_periods
+        self.alpha = 1.0 - math.exp(math.log(0.5) / halflife)
+
+        n = len(self.symbols)
+        self.count = 0
+        self.timestamp = None
+        self.synced_at = None
+        self.last_prices = None
+        self.mean = np.zeros(n, dtype=self.dtype)
+        self.covariance = np.zeros((n, n), dtype=self.dtype)
+        if method == 'window':
+            self.buffer = np.zeros((window, n), dtype=self.dtype)
+            self.sums = np.zeros(n, dtype=self.dtype)
+            self.cross = np.zeros((n, n), dtype=self.dtype)
+
+        self._version = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.count >= self.min_periods
+
+    def update(self, returns, timestamp=None, publish=True):
+        """
+        Add one bar of returns (one value per symbol)
+        """
+        r = np.nan_to_num(np.asarray(returns, dtype=self.dtype), nan=0.0, posinf=0.0, neginf=0.0)
+        with self._lock:
+            if self.method == 'ewma':
+                self._update_ewma(r)
+            else:
+                self._update_window(r)
+            self.count += 1
+            self.timestamp = timestamp
+            if publish:
+                self._publish()
+        return self._snapshot if publish else None
+
+    def _update_ewma(self, r):
+        if self.count == 0:
+            self.mean[:] = r
+            return
+        delta = r - self.mean
+        self.mean += self.alpha * delta
+        self.covariance += self.alpha * np.outer(delta, delta)
+        self.covariance *= 1.0 - self.alpha
+
+    def _update_window(self, r):
+        slot = self.count % self.window
+        old = self.buffer[slot].copy()
+        self.buffer[slot] = r
+        self.sums += r - old
+        self.cross += np.outer(r, r)
+        self.cross -= np.outer(old, old)
+        if (self.count + 1) % self.RESYNC_EVERY == 0:
+            self.sums = self.buffer.sum(axis=0, dtype=np.float64).astype(self.dtype)
+            self.cross = (self.buffer.T.astype(np.float64) @ self.buffer).astype(self.dtype)
+
+    def update_prices(self, prices, timestamp=None, publish=True):
+        """
+        Add one bar of prices; returns are taken against the previous bar
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        if self.last_prices is None:
+            self.last_prices = prices.copy()
+            self.timestamp = timestamp
+            return None
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = prices / self.last_prices - 1.0
+        self.last_prices = np.where(np.isnan(prices), self.last_prices, prices)
+        return self.update(returns, timestamp, publish)
+
+    def update_panel(self, panel):
+        """
+        Feed the rows of a close-price panel (dates x symbols) newer than the
+        last bar seen, publishing one snapshot at the end
+        """
+        panel = panel.reindex(columns=self.symbols).sort_index()
+        if self.timestamp is not None:
+            panel = panel[panel.index > self.timestamp]
+        values = panel.to_numpy(dtype=np.float64)
+        for timestamp, prices in zip(panel.index, values):
+            self.update_prices(prices, timestamp, publish=False)
+        if len(panel):
+            with self._lock:
+                self._publish()
+        self.synced_at = datetime.now()
+        return self._snapshot
+
+    def age(self):
+        """
+        Seconds since the engine was last synced with a panel (inf if never)
+        """
+        if self.synced_at is None:
+            return float('inf')
+        return (datetime.now() - self.synced_at).total_seconds()
+
+    def _publish(self):
+        if self.method == 'window':
+            n = min(self.count, self.window)
+            if n > 1:
+                self.covariance = (self.cross - np.outer(self.sums, self.sums) / n) / (n - 1)
+                self.mean = self.sums / n
+        self._version += 1
+        self._snapshot = MomentSnapshot(
+            self.symbols, self._version, self.timestamp, self.count,
+            self.mean.copy(), self.covariance.copy()
+        )
+
+    def snapshot(self):
+        """
+        Latest published snapshot, or None before min_periods bars
+        """
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.count < self.min_periods:
+            return None
+        return snapshot
+
+
+_market_engine = None
+_market_lock = threading.Lock()
+
+
+def update_market_moments(panel):
+    """
+    Feed new bars of the market panel to the process-wide engine, creating
+    (or recreating, when the symbols change) it from the panel's history
+    """
+    global _market_engine
+    if CORRELATION_METHOD == 'static':
+        return None
+    with _market_lock:
+        symbols = list(panel.columns)
+        if _market_engine is None or _market_engine.symbols != symbols:
+            _market_engine = MomentEngine(symbols)
+        _market_engine.update_panel(panel)
+        return _market_engine.snapshot()
+
+
+def get_market_moments(max_age=None):
+    """
+    Latest snapshot of the market moments, or None if none is available or
+    the engine was last synced more than max_age seconds ago
+    """
+    engine = _market_engine
+    if engine is None or (max_age is not None and engine.age() > max_age):
+        return None
+    return engine.snapshot()
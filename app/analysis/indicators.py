@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+from config import TECHNICAL_INDICATORS
+
+# Column names produced by the engine, following the periods in TECHNICAL_INDICATORS
+SMA_SHORT = f"SMA_{TECHNICAL_INDICATORS['SMA']['short']}"
+SMA_LONG = f"SMA_{TECHNICAL_INDICATORS['SMA']['long']}"
+EMA_SHORT = f"EMA_{TECHNICAL_INDICATORS['EMA']['short']}"
+EMA_LONG = f"EMA_{TECHNICAL_INDICATORS['EMA']['long']}"
+
+INDICATOR_COLUMNS = [
+    'RSI', 'MACD', 'MACD_Signal', 'MACD_Histogram',
+    SMA_SHORT, SMA_LONG, EMA_SHORT, EMA_LONG,
+    'BB_Upper', 'BB_Lower', 'BB_Middle'
+]
+
+
+def first_valid(values):
+    """
+    Index of the first non-NaN row per column (len(values) for empty columns)
+    """
+    valid = ~np.isnan(values)
+    first = valid.argmax(axis=0)
+    first[~valid.any(axis=0)] = len(values)
+    return first
+
+
+def fill_gaps(values, first):
+    """
+    Forward-fill interior gaps and back-fill each column's leading NaNs with
+    its first valid value. Back-filling keeps adjust=False EWM recursions and
+    differences exact, since the state stays constant until real data starts.
+    """
+    rows = np.arange(len(values))[:, None]
+    idx = np.where(~np.isnan(values), rows, 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    idx = np.maximum(idx, np.minimum(first, len(values) - 1))
+    return np.take_along_axis(values, idx, axis=0)
+
+
+def mask_before(values, start):
+    """
+    Set rows before each column's start index to NaN
+    """
+    values[np.arange(len(values))[:, None] < start] = np.nan
+    return values
+
+
+def ewm(values, alpha):
+    """
+    Exponentially weighted mean (pandas adjust=False) down every column at once,
+    run as the linear filter y[t] = alpha * x[t] + (1 - alpha) * y[t-1] seeded
+    so that y[0] = x[0]
+    """
+    if len(values) == 0:
+        return np.empty_like(values)
+    out, _ = lfilter([alpha], [1.0, alpha - 1.0], values, axis=0, zi=(1.0 - alpha) * values[:1])
+    return out.astype(values.dtype, copy=False)
+
+
+def _rolling_sum(values, window):
+    """
+    Trailing rolling sum via prefix sums; the first window-1 rows are NaN
+    """
+    csum = np.cumsum(values, axis=0)
+    out = np.full_like(values, np.nan)
+    if len(values) >= window:
+        out[window - 1] = csum[window - 1]
+        out[window:] = csum[window:] - csum[:-window]
+    return out
+
+
+def compute_indicators(close, params=None, dtype=np.float64):
+    """
+    Compute RSI, MACD, SMAs, EMAs and Bollinger Bands for a 2D (time x symbols)
+    array of closes in one vectorized pass.
+
+    Columns may start at different rows (leading NaNs); each indicator begins
+    once its own warm-up period has elapsed for that column, matching the
+    `ta` library. Returns a dict of {column name: (time x symbols) array}.
+    """
+    params = params or TECHNICAL_INDICATORS
+    close = np.asarray(close, dtype=dtype)
+    if close.ndim == 1:
+        close = close[:, None]
+    if len(close) == 0:
+        return {name: close.copy() for name in INDICATOR_COLUMNS}
+
+    first = first_valid(close)
+    prices = fill_gaps(close, first)
+    results = {}
+
+    # RSI with Wilder smoothing
+    window = params['RSI']['period']
+    diff = np.zeros_like(prices)
+    diff[1:] = prices[1:] - prices[:-1]
+    avg_gain = ewm(np.maximum(diff, 0.0), 1.0 / window)
+    avg_loss = ewm(np.maximum(-diff, 0.0), 1.0 / window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    results['RSI'] = mask_before(rsi.astype(dtype), first + window - 1)
+
+    # MACD
+    fast, slow, signal = params['MACD']['fast'], params['MACD']['slow'], params['MACD']['signal']
+    macd = ewm(prices, 2.0 / (fast + 1)) - ewm(prices, 2.0 / (slow + 1))
+    macd_start = first + slow - 1
+    macd_signal = ewm(fill_gaps(mask_before(macd.copy(), macd_start), macd_start), 2.0 / (signal + 1))
+    results['MACD'] = mask_before(macd, macd_start)
+    results['MACD_Signal'] = mask_before(macd_signal, macd_start + signal - 1)
+    results['MACD_Histogram'] = results['MACD'] - results['MACD_Signal']
+
+    # Simple and exponential moving averages
+    for name, period in ((SMA_SHORT, params['SMA']['short']), (SMA_LONG, params['SMA']['long'])):
+        results[name] = mask_before(_rolling_sum(prices, period) / period, first + period - 1)
+    for name, period in ((EMA_SHORT, params['EMA']['short']), (EMA_LONG, params['EMA']['long'])):
+        results[name] = mask_before(ewm(prices, 2.0 / (period + 1)), first + period - 1)
+
+    # Bollinger Bands (population std, as in `ta`); values are centred on each
+    # column's first price to keep the sum-of-squares variance numerically stable
+    window, width = params['BB']['period'], params['BB']['std_dev']
+    anchor = prices[np.minimum(first, len(prices) - 1), np.arange(prices.shape[1])]
+    centred = prices - anchor
+    mean = _rolling_sum(centred, window) / window
+    variance = np.maximum(_rolling_sum(centred * centred, window) / window - mean * mean, 0.0)
+    middle = mask_before(mean + anchor, first + window - 1)
+    band = width * np.sqrt(variance)
+    results['BB_Middle'] = middle
+    results['BB_Upper'] = middle + band
+    results['BB_Lower'] = middle - band
+
+    return {name: results[name] for name in INDICATOR_COLUMNS}
+
+
+def compute_indicator_panel(panel, params=None):
+    """
+    Compute indicators for a wide close-price DataFrame (dates x symbols).
+    Returns a dict of {column name: DataFrame} aligned with the panel.
+    """
+    results = compute_indicators(panel.to_numpy(dtype=np.float64), params)
+    return {
+        name: pd.DataFrame(values, index=panel.index, columns=panel.columns)
+        for name, values in results.items()
+    }
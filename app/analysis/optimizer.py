@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from sklearn.covariance import LedoitWolf
+from utils.constants import SECTOR_ETFS, RISK_LEVELS as RISK_LIMITS, INVESTMENT_HORIZONS as HORIZON_LIMITS
+from analysis.risk import ASSET_CLASS_INSTRUMENTS, TRADING_DAYS
+
+OPTIMIZER_MODES = ['min_variance', 'max_sharpe', 'risk_parity']
+
+# Last solution per (mode, instruments), used as the starting point of the next solve
+_warm_starts = {}
+
+
+def shrunk_moments(panel):
+    """
+    Annualized mean returns and Ledoit-Wolf shrunk covariance (as fractions)
+    from a close-price panel
+    """
+    returns = panel.pct_change(fill_method=None).iloc[1:].dropna()
+    covariance = LedoitWolf().fit(returns.to_numpy()).covariance_ * TRADING_DAYS
+    expected_returns = returns.mean().to_numpy() * TRADING_DAYS
+    return expected_returns, covariance
+
+
+def allocation_limits(risk_level, investment_horizon):
+    """
+    Combine the risk-level and horizon bounds into one set of limits
+    """
+    risk = RISK_LIMITS[risk_level]
+    horizon = HORIZON_LIMITS[investment_horizon]
+    return {
+        'max_equity': min(risk['max_equity_allocation'], horizon['max_equity_allocation']),
+        'max_commodities': risk['max_commodity_allocation'],
+        'max_forex': risk['max_forex_allocation'],
+        'min_fixed_income': max(risk['min_fixed_income_allocation'], horizon['min_fixed_income_allocation'])
+    }
+
+
+def _objective(mode, expected_returns, covariance, risk_free_rate):
+    if mode == 'min_variance':
+        def objective(w):
+            sigma_w = covariance @ w
+            return w @ sigma_w, 2 * sigma_w
+        return objective, True
+
+    if mode == 'max_sharpe':
+        def objective(w):
+            sigma_w = covariance @ w
+            volatility = np.sqrt(w @ sigma_w)
+            excess = w @ expected_returns - risk_free_rate
+            value = -excess / volatility
+            gradient = -(expected_returns * volatility - excess * sigma_w / volatility) / volatility ** 2
+            return value, gradient
+        return objective, True
+
+    raise ValueError(f"Unknown optimizer mode '{mode}', expected one of {OPTIMIZER_MODES}")
+
+
+def _share_constraint(member, bound, upper):
+    """
+    Linear constraint on unnormalized weights y keeping the share
+    member @ y / sum(y) below (upper) or above a bound
+    """
+    sign = 1.0 if upper else -1.0
+    direction = sign * (bound - member)
+    return {'type': 'ineq', 'fun': lambda y: direction @ y, 'jac': lambda y: direction}
+
+
+def risk_parity_weights(covariance, groups, limits, warm_start_key=None):
+    """
+    Equal risk contribution weights under the allocation limits.
+
+    Solves the convex log-barrier problem min 1/2 y'Sy - sum(b log y) with
+    b = 1/n, where every limit on a class share of w = y / sum(y) is a
+    linear constraint on y. When no limit binds the normalized solution has
+    exactly equal risk contributions; otherwise it is the risk budgeting
+    portfolio closest to them within the limits. Returns (weights, success).
+    """
+    n = len(groups)
+    groups = np.asarray(groups)
+    budget = np.full(n, 1.0 / n)
+
+    def objective(y):
+        sigma_y = covariance @ y
+        return 0.5 * y @ sigma_y - budget @ np.log(y), sigma_y - budget / y
+
+    constraints = [
+        _share_constraint((groups == group).astype(float), limits[limit], upper=True)
+        for group, limit in (('equity', 'max_equity'), ('commodities', 'max_commodities'), ('forex', 'max_forex'))
+    ]
+    constraints.append(
+        _share_constraint((groups == 'fixed_income').astype(float), limits['min_fixed_income'], upper=False)
+    )
+
+    x0 = _warm_starts.get(warm_start_key)
+    if x0 is None or len(x0) != n:
+        x0 = np.sqrt(budget / np.diag(covariance))
+    result = minimize(
+        objective,
+        x0,
+        jac=True,
+        method='SLSQP',
+        bounds=[(1e-10, None)] * n,
+        constraints=constraints,
+        options={'maxiter': 500, 'ftol': 1e-9}
+    )
+    y = result.x
+    if not result.success or not np.all(np.isfinite(y)) or y.sum() <= 0:
+        return np.full(n, 1.0 / n), False
+    if warm_start_key is not None:
+        _warm_starts[warm_start_key] = y
+    return y / y.sum(), True
+
+
+def optimize_weights(expected_returns, covariance, groups, limits, mode='risk_parity',
+                     risk_free_rate=0.02, warm_start_key=None):
+    """
+    Solve for long-only weights summing to one under the allocation limits.
+
+    groups maps each asset position to 'equity', 'commodities', 'forex' or
+    'fixed_income'. Returns (weights, success).
+    """
+    if mode == 'risk_parity':
+        return risk_parity_weights(covariance, groups, limits, warm_start_key)
+
+    n = len(expected_returns)
+    groups = np.asarray(groups)
+    equity = (groups == 'equity').astype(float)
+    fixed_income = (groups == 'fixed_income').astype(float)
+
+    upper = {
+        'equity': limits['max_equity'],
+        'commodities': limits['max_commodities'],
+        'forex': limits['max_forex'],
+        'fixed_income': 1.0
+    }
+    bounds = [(0.0, upper[group]) for group in groups]
+    constraints = [
+        {'type': 'eq', 'fun': lambda w: np.sum(w) - 1.0, 'jac': lambda w: np.ones(n)},
+        {'type': 'ineq', 'fun': lambda w: limits['max_equity'] - equity @ w, 'jac': lambda w: -equity},
+        {'type': 'ineq', 'fun': lambda w: fixed_income @ w - limits['min_fixed_income'], 'jac': lambda w: fixed_income}
+    ]
+
+    x0 = _warm_starts.get(warm_start_key)
+    if x0 is None or len(x0) != n:
+        x0 = np.full(n, 1.0 / n)
+
+    objective, has_gradient = _objective(mode, expected_returns, covariance, risk_free_rate)
+    result = minimize(
+        objective,
+        x0,
+        jac=has_gradient,
+        method='SLSQP',
+        bounds=bounds,
+        constraints=constraints,
+        options={'maxiter': 200}
+    )
+    weights = np.clip(result.x, 0.0, None)
+    weights = weights / weights.sum()
+    if result.success and warm_start_key is not None:
+        _warm_starts[warm_start_key] = weights
+    return weights, bool(result.success)
+
+
+def optimize_allocation(panel, risk_level, investment_horizon, preferred_sectors=None, mode='risk_parity'):
+    """
+    Optimize weights over the preferred sector ETFs plus the commodity,
+    forex and fixed income instruments, using shrunk covariance from the
+    shared price panel and the limits in utils.constants.
+
+    Returns {'allocation', 'sector_breakdown', 'weights'} or None when the
+    panel lacks data or the solver fails.
+    """
+    sectors = [sector for sector in (preferred_sectors or SECTOR_ETFS.keys()) if sector in SECTOR_ETFS]
+    instruments = [SECTOR_ETFS[sector] for sector in sectors]
+    groups = ['equity'] * len(instruments)
+    for asset_class in ('commodities', 'forex', 'fixed_income'):
+        instruments.append(ASSET_CLASS_INSTRUMENTS[asset_class])
+        groups.append(asset_class)
+
+    prices = panel.reindex(columns=instruments)
+    if prices.isna().all().any() or len(prices.dropna()) < 30:
+        return None
+
+    expected_returns, covariance = shrunk_moments(prices)
+    limits = allocation_limits(risk_level, investment_horizon)
+    weights, success = optimize_weights(
+        expected_returns, covariance, groups, limits,
+        mode=mode, warm_start_key=(mode, tuple(instruments))
+    )
+    if not success:
+        return None
+
+    weights = pd.Series(weights, index=instruments)
+    sector_breakdown = {sector: float(weights[SECTOR_ETFS[sector]]) for sector in sectors}
+    allocation = {
+        'equity': float(sum(sector_breakdown.values())),
+        'commodities': float(weights[ASSET_CLASS_INSTRUMENTS['commodities']]),
+        'forex': float(weights[ASSET_CLASS_INSTRUMENTS['forex']]),
+        'fixed_income': float(weights[ASSET_CLASS_INSTRUMENTS['fixed_income']])
+    }
+    return {
+        'allocation': allocation,
+        'sector_breakdown': sector_breakdown,
+        'weights': weights
+    }
@@ -1,35 +1,32 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from datetime import datetime, timedelta
-from config import RISK_LEVELS, INVESTMENT_HORIZONS, SECTORS
+from config import RISK_LEVELS, INVESTMENT_HORIZONS, SECTORS, PORTFOLIO_OPTIMIZER, SNAPSHOT_MAX_AGE
+from utils.constants import SECTOR_ETFS
+from data.panel import ASSET_CLASS_SYMBOLS, get_market_panel
+from data.snapshot import get_current_snapshot
+from utils.cache import cached
+from utils.metrics import timed, increment, record_error
+from analysis.risk import estimate_moments, instrument_weights, weight_matrix, risk_metrics
+from analysis.optimizer import optimize_allocation
+from analysis.correlation import get_market_moments
 
-def get_sector_performance():
+def get_sector_performance(panel=None):
     """
     Get performance metrics for different sectors
     """
-    sector_etfs = {
-        'Technology': 'XLK',
-        'Healthcare': 'XLV',
-        'Finance': 'XLF',
-        'Energy': 'XLE',
-        'Consumer Goods': 'XLP',
-        'Industrial': 'XLI',
-        'Materials': 'XLB',
-        'Utilities': 'XLU',
-        'Real Estate': 'XLRE',
-        'Communication Services': 'XLC'
-    }
+    if panel is None:
+        panel = get_market_panel()
     
     performance = {}
-    for sector, etf in sector_etfs.items():
+    for sector, etf in SECTOR_ETFS.items():
         try:
-            data = yf.download(etf, period='1y')
-            if data.empty:
+            prices = panel[etf].dropna() if etf in panel else pd.Series(dtype=float)
+            if prices.empty:
                 raise ValueError(f"No data available for {sector}")
                 
-            returns = (data['Close'][-1] / data['Close'][0] - 1) * 100
-            volatility = data['Close'].pct_change().std() * np.sqrt(252) * 100
+            returns = (prices.iloc[-1] / prices.iloc[0] - 1) * 100
+            volatility = prices.pct_change().std() * np.sqrt(252) * 100
             
             # Ensure we have valid numbers
             if np.isnan(returns) or np.isnan(volatility):
@@ -52,7 +49,7 @@ def get_sector_performance():
     # Ensure we have at least one valid sector
     if not performance:
         # Provide default values for all sectors
-        for sector in sector_etfs.keys():
+        for sector in SECTOR_ETFS.keys():
             performance[sector] = {
                 'returns': 0.0,
                 'volatility': 1.0,
@@ -61,30 +58,25 @@ def get_sector_performance():
     
     return performance
 
-def calculate_asset_correlation():
+def calculate_asset_correlation(panel=None):
     """
-    Calculate correlation between different asset classes
+    Calculate correlation between different asset classes.
+    Without a panel, the incrementally maintained market moments are used
+    when they cover the assets and were synced within SNAPSHOT_MAX_AGE.
     """
-    assets = {
-        'SPY': 'Equity',
-        'GLD': 'Gold',
-        'TLT': 'Bonds',
-        'UUP': 'USD',
-        'DBC': 'Commodities'
-    }
-    
-    # Get historical data
-    data = pd.DataFrame()
-    valid_assets = []
+    assets = ASSET_CLASS_SYMBOLS
+    if panel is None:
+        moments = get_market_moments(max_age=SNAPSHOT_MAX_AGE)
+        if moments is not None and all(symbol in moments.symbols for symbol in assets):
+            return moments.correlation_frame(list(assets.keys()))
+        panel = get_market_panel()
     
-    for symbol in assets.keys():
-        try:
-            prices = yf.download(symbol, period='1y')['Close']
-            if not prices.empty and not prices.isna().all():
-                data[symbol] = prices
-                valid_assets.append(symbol)
-        except Exception as e:
-            print(f"Error fetching data for {symbol}: {str(e)}")
+    # Keep only assets with usable history
+    valid_assets = [
+        symbol for symbol in assets.keys()
+        if symbol in panel and not panel[symbol].isna().all()
+    ]
+    data = panel[valid_assets]
     
     # If we have no valid data, return a default correlation matrix
     if data.empty or len(valid_assets) < 2:
@@ -110,131 +102,260 @@ def calculate_asset_correlation():
             columns=assets.keys()
         )
 
-def generate_portfolio_suggestions(capital, risk_level, investment_horizon, preferred_sectors):
+def _heuristic_allocation(sector_performance, risk_level, investment_horizon, preferred_sectors):
     """
-    Generate portfolio allocation suggestions based on user preferences
+    Scale the static risk-level allocation by horizon and weight sectors by
+    recent Sharpe ratio and returns
     """
-    try:
-        # Get market data
-        sector_performance = get_sector_performance()
-        asset_correlation = calculate_asset_correlation()
-        
-        # Get base allocation from risk level
-        base_allocation = RISK_LEVELS[risk_level].copy()
-        
-        # Adjust allocation based on investment horizon
-        horizon_months = INVESTMENT_HORIZONS[investment_horizon]['months']
-        if horizon_months <= 3:  # Short term
-            base_allocation['equity_allocation'] *= 0.8
-            base_allocation['fixed_income_allocation'] *= 1.2
-        elif horizon_months >= 60:  # Long term
-            base_allocation['equity_allocation'] *= 1.2
-            base_allocation['fixed_income_allocation'] *= 0.8
-        
-        # Calculate sector weights within equity allocation
-        sector_weights = {}
-        total_weight = 0
-        
-        # If no sectors are selected, use all sectors
-        if not preferred_sectors:
-            preferred_sectors = SECTORS
-        
+    # Get base allocation from risk level
+    base_allocation = RISK_LEVELS[risk_level].copy()
+    
+    # Adjust allocation based on investment horizon
+    horizon_months = INVESTMENT_HORIZONS[investment_horizon]['months']
+    if horizon_months <= 3:  # Short term
+        base_allocation['equity_allocation'] *= 0.8
+        base_allocation['fixed_income_allocation'] *= 1.2
+    elif horizon_months >= 60:  # Long term
+        base_allocation['equity_allocation'] *= 1.2
+        base_allocation['fixed_income_allocation'] *= 0.8
+    
+    # Calculate sector weights within equity allocation
+    sector_weights = {}
+    total_weight = 0
+    
+    for sector in preferred_sectors:
+        if sector in sector_performance:
+            # Weight based on Sharpe ratio and recent performance
+            performance = sector_performance[sector]
+            weight = (performance['sharpe_ratio'] + 1) * (1 + performance['returns'] / 100)
+            sector_weights[sector] = max(weight, 0)  # Ensure non-negative weights
+            total_weight += sector_weights[sector]
+    
+    # If no valid weights were calculated, use equal weights
+    if total_weight == 0:
         for sector in preferred_sectors:
-            if sector in sector_performance:
-                # Weight based on Sharpe ratio and recent performance
-                performance = sector_performance[sector]
-                weight = (performance['sharpe_ratio'] + 1) * (1 + performance['returns'] / 100)
-                sector_weights[sector] = max(weight, 0)  # Ensure non-negative weights
-                total_weight += sector_weights[sector]
-        
-        # If no valid weights were calculated, use equal weights
-        if total_weight == 0:
-            for sector in preferred_sectors:
-                sector_weights[sector] = 1.0 / len(preferred_sectors)
-        else:
-            # Normalize sector weights
-            for sector in sector_weights:
-                sector_weights[sector] = sector_weights[sector] / total_weight
-        
-        # Calculate final allocation
-        allocation = {
-            'equity': base_allocation['equity_allocation'],
-            'commodities': base_allocation['commodities_allocation'],
-            'forex': base_allocation['forex_allocation'],
-            'fixed_income': base_allocation['fixed_income_allocation']
-        }
-        
-        # Add sector breakdown
-        sector_allocation = {}
-        for sector, weight in sector_weights.items():
-            sector_allocation[sector] = weight * allocation['equity']
-        
-        # Generate recommendations
-        recommendations = {
-            'allocation': allocation,
-            'sector_breakdown': sector_allocation,
-            'total_capital': capital,
-            'risk_level': risk_level,
-            'investment_horizon': investment_horizon,
-            'market_analysis': {
-                'sector_performance': sector_performance,
-                'asset_correlation': asset_correlation
-            }
+            sector_weights[sector] = 1.0 / len(preferred_sectors)
+    else:
+        # Normalize sector weights
+        for sector in sector_weights:
+            sector_weights[sector] = sector_weights[sector] / total_weight
+    
+    # Calculate final allocation
+    allocation = {
+        'equity': base_allocation['equity_allocation'],
+        'commodities': base_allocation['commodities_allocation'],
+        'forex': base_allocation['forex_allocation'],
+        'fixed_income': base_allocation['fixed_income_allocation']
+    }
+    
+    # Add sector breakdown
+    sector_allocation = {}
+    for sector, weight in sector_weights.items():
+        sector_allocation[sector] = weight * allocation['equity']
+    
+    return allocation, sector_allocation
+
+ALLOCATION_CLASSES = ['equity', 'commodities', 'forex', 'fixed_income']
+
+@timed('portfolio.market_analysis')
+def build_market_analysis(panel):
+    """
+    Compute the market analysis shared by every portfolio suggestion
+    """
+    expected_returns, covariance = estimate_moments(panel)
+    return {
+        'sector_performance': get_sector_performance(panel),
+        'asset_correlation': calculate_asset_correlation(panel),
+        'expected_returns': expected_returns,
+        'covariance': covariance
+    }
+
+def _default_portfolio(capital, risk_level, investment_horizon):
+    """
+    Default portfolio returned when suggestions cannot be generated
+    """
+    return {
+        'allocation': {
+            'equity': 0.4,
+            'commodities': 0.2,
+            'forex': 0.2,
+            'fixed_income': 0.2
+        },
+        'sector_breakdown': {sector: 0.1 for sector in SECTORS},
+        'total_capital': capital,
+        'risk_level': risk_level,
+        'investment_horizon': investment_horizon,
+        'degraded': True,
+        'market_analysis': {
+            'sector_performance': {sector: {'returns': 0, 'volatility': 1, 'sharpe_ratio': 0} for sector in SECTORS},
+            'asset_correlation': pd.DataFrame(np.eye(5), index=['SPY', 'GLD', 'TLT', 'UUP', 'DBC'], columns=['SPY', 'GLD', 'TLT', 'UUP', 'DBC'])
         }
-        
-        return recommendations
-        
+    }
+
+@timed('portfolio.optimize')
+def _solve_allocation(panel, market_analysis, risk_level, investment_horizon, preferred_sectors, optimizer_mode):
+    """
+    Solve one set of preferences, returning (allocation, sector_breakdown, mode used)
+    """
+    optimized = None
+    if optimizer_mode != 'heuristic':
+        optimized = optimize_allocation(
+            panel, risk_level, investment_horizon, preferred_sectors, mode=optimizer_mode
+        )
+    
+    if optimized is not None:
+        return optimized['allocation'], optimized['sector_breakdown'], optimizer_mode
+    
+    if optimizer_mode != 'heuristic':
+        increment('optimizer_fallbacks_total', mode=optimizer_mode)
+        print(f"Optimizer '{optimizer_mode}' found no solution for {risk_level}/{investment_horizon}, "
+              f"using the heuristic allocation")
+    allocation, sector_allocation = _heuristic_allocation(
+        market_analysis['sector_performance'], risk_level, investment_horizon, preferred_sectors
+    )
+    return allocation, sector_allocation, 'heuristic'
+
+@timed('portfolio.batch')
+def generate_portfolio_suggestions_batch(profiles, optimizer_mode=PORTFOLIO_OPTIMIZER, panel=None):
+    """
+    Generate portfolio suggestions for many client profiles from one market snapshot.
+    
+    profiles is a list of (capital, risk_level, investment_horizon, preferred_sectors)
+    tuples. The market analysis is computed once and shared by all results,
+    allocations are solved once per distinct (risk level, horizon, sectors)
+    combination, and capital amounts and risk metrics are computed for all
+    profiles together as matrix operations. Results built without market
+    data or from an optimizer fallback are marked degraded.
+    """
+    profiles = [tuple(profile) for profile in profiles]
+    try:
+        snapshot = get_current_snapshot(max_age=SNAPSHOT_MAX_AGE, part='market_analysis') if panel is None else None
+        if snapshot is not None and snapshot.market_analysis:
+            # Reuse the analysis precomputed by the background refresher
+            panel = snapshot.panel
+            market_analysis = dict(snapshot.market_analysis)
+        else:
+            # Get market data from a single batched price panel
+            if panel is None:
+                panel = get_market_panel()
+            market_analysis = build_market_analysis(panel)
     except Exception as e:
+        record_error('portfolio.market_analysis')
         print(f"Error generating portfolio suggestions: {str(e)}")
-        # Return a default portfolio if something goes wrong
-        return {
-            'allocation': {
-                'equity': 0.4,
-                'commodities': 0.2,
-                'forex': 0.2,
-                'fixed_income': 0.2
-            },
-            'sector_breakdown': {sector: 0.1 for sector in SECTORS},
+        return [_default_portfolio(*profile[:3]) for profile in profiles]
+    
+    no_data = panel is None or panel.dropna(how='all').empty
+    
+    # Solve once per distinct combination of preferences
+    solutions = {}
+    keys = []
+    for capital, risk_level, investment_horizon, preferred_sectors in profiles:
+        # If no sectors are selected, use all sectors
+        key = (risk_level, investment_horizon, tuple(preferred_sectors or SECTORS))
+        keys.append(key)
+        if key in solutions:
+            continue
+        try:
+            solutions[key] = _solve_allocation(
+                panel, market_analysis, risk_level, investment_horizon, list(key[2]), optimizer_mode
+            )
+        except Exception as e:
+            record_error('portfolio.optimize')
+            print(f"Error generating portfolio suggestions: {str(e)}")
+            solutions[key] = None
+    
+    # Capital amounts and risk metrics for every solved profile at once
+    solved = [i for i, key in enumerate(keys) if solutions[key] is not None]
+    rows = {profile_index: row for row, profile_index in enumerate(solved)}
+    covariance = market_analysis['covariance']
+    weights = weight_matrix([solutions[keys[i]][:2] for i in solved], list(covariance.index))
+    metrics = risk_metrics(
+        weights,
+        market_analysis['expected_returns'].reindex(covariance.index).to_numpy(),
+        covariance.to_numpy(),
+        risk_free_rate=2.0
+    )
+    class_weights = np.array(
+        [[solutions[keys[i]][0][name] for name in ALLOCATION_CLASSES] for i in solved]
+    ).reshape(len(solved), len(ALLOCATION_CLASSES))
+    capitals = np.array([profiles[i][0] for i in solved], dtype=float)
+    amounts = capitals[:, None] * class_weights
+    
+    # Generate recommendations
+    results = []
+    for i, (capital, risk_level, investment_horizon, _) in enumerate(profiles):
+        if i not in rows:
+            results.append(_default_portfolio(capital, risk_level, investment_horizon))
+            continue
+        
+        row = rows[i]
+        allocation, sector_allocation, mode = solutions[keys[i]]
+        results.append({
+            'allocation': dict(allocation),
+            'sector_breakdown': dict(sector_allocation),
+            'allocation_amounts': dict(zip(ALLOCATION_CLASSES, amounts[row].tolist())),
             'total_capital': capital,
             'risk_level': risk_level,
             'investment_horizon': investment_horizon,
-            'market_analysis': {
-                'sector_performance': {sector: {'returns': 0, 'volatility': 1, 'sharpe_ratio': 0} for sector in SECTORS},
-                'asset_correlation': pd.DataFrame(np.eye(5), index=['SPY', 'GLD', 'TLT', 'UUP', 'DBC'], columns=['SPY', 'GLD', 'TLT', 'UUP', 'DBC'])
-            }
-        }
+            'optimizer': mode,
+            'optimizer_fallback': mode != optimizer_mode,
+            'degraded': no_data or mode != optimizer_mode,
+            'metrics': {
+                'expected_return': float(metrics['expected_return'][row]),
+                'volatility': float(metrics['volatility'][row]),
+                'sharpe_ratio': float(metrics['sharpe_ratio'][row])
+            },
+            'market_analysis': market_analysis
+        })
+    
+    return results
 
+@cached('portfolio_analysis', copy_result=True, cacheable=lambda portfolio: not portfolio.get('degraded'))
+def generate_portfolio_suggestions(capital, risk_level, investment_horizon, preferred_sectors,
+                                   optimizer_mode=PORTFOLIO_OPTIMIZER):
+    """
+    Generate portfolio allocation suggestions based on user preferences.
+    
+    optimizer_mode is 'min_variance', 'max_sharpe' or 'risk_parity' to solve
+    for weights from shrunk covariance, or 'heuristic' for the static
+    risk-level allocation. The heuristic is also used if the solve fails,
+    in which case the result has optimizer_fallback set. Degraded results
+    are not cached, so suggestions recover as soon as market data does.
+    """
+    profile = (capital, risk_level, investment_horizon, preferred_sectors)
+    return generate_portfolio_suggestions_batch([profile], optimizer_mode=optimizer_mode)[0]
+
+@timed('portfolio.metrics')
 def calculate_portfolio_metrics(portfolio):
     """
-    Calculate key portfolio metrics
+    Calculate key portfolio metrics.
+    
+    Asset classes and sectors are mapped to their instruments and the
+    metrics come from the annualized return/covariance estimates of the
+    price panel. Returns and volatility are in percent, like sector_performance.
     """
-    allocation = portfolio['allocation']
     market_analysis = portfolio['market_analysis']
+    expected_returns = market_analysis.get('expected_returns')
+    covariance = market_analysis.get('covariance')
+    if expected_returns is None or covariance is None:
+        expected_returns, covariance = estimate_moments(get_market_panel())
     
-    # Calculate expected return
-    expected_return = 0
-    for asset, weight in allocation.items():
-        if asset in market_analysis['sector_performance']:
-            expected_return += weight * market_analysis['sector_performance'][asset]['returns']
-    
-    # Calculate portfolio volatility
-    volatility = 0
-    for asset1, weight1 in allocation.items():
-        for asset2, weight2 in allocation.items():
-            if asset1 in market_analysis['asset_correlation'] and asset2 in market_analysis['asset_correlation']:
-                corr = market_analysis['asset_correlation'].loc[asset1, asset2]
-                vol1 = market_analysis['sector_performance'][asset1]['volatility'] if asset1 in market_analysis['sector_performance'] else 0
-                vol2 = market_analysis['sector_performance'][asset2]['volatility'] if asset2 in market_analysis['sector_performance'] else 0
-                volatility += weight1 * weight2 * corr * vol1 * vol2
-    
-    volatility = np.sqrt(volatility)
+    # Weights per instrument, restricted to instruments with estimates
+    weights = instrument_weights(portfolio['allocation'], portfolio.get('sector_breakdown'))
+    instruments = [symbol for symbol in weights.index if symbol in covariance.index]
+    weights = weights[instruments]
     
-    # Calculate Sharpe ratio
-    risk_free_rate = 0.02  # Assuming 2% risk-free rate
-    sharpe_ratio = (expected_return - risk_free_rate) / volatility if volatility != 0 else 0
+    # Assuming 2% risk-free rate
+    metrics = risk_metrics(
+        weights.to_numpy(),
+        expected_returns[instruments].to_numpy(),
+        covariance.loc[instruments, instruments].to_numpy(),
+        risk_free_rate=2.0
+    )
     
     return {
-        'expected_return': expected_return,
-        'volatility': volatility,
-        'sharpe_ratio': sharpe_ratio
+        'expected_return': float(metrics['expected_return']),
+        'volatility': float(metrics['volatility']),
+        'sharpe_ratio': float(metrics['sharpe_ratio']),
+        'risk_contributions': dict(zip(instruments, metrics['component_risk'].tolist()))
     } 
\ No newline at end of file
@@ -0,0 +1,255 @@
+import math
+import threading
+import schedule
+import pandas as pd
+from datetime import datetime
+from config import SCRAPING_INTERVAL, SNAPSHOT_WATCHLIST, BAR_STORE_ENABLED
+from data.providers import get_data_provider, period_to_offset, OHLCV_COLUMNS
+from data.store import BarStore, get_bar_store, ADJUSTMENT_TOLERANCE
+from data.panel import MARKET_PANEL_SYMBOLS, ASSET_CLASS_SYMBOLS, load_price_panel
+from data.snapshot import publish_snapshot, get_current_snapshot
+from analysis.portfolio import build_market_analysis
+from analysis.correlation import update_market_moments
+from analysis.technical import summarize_stock, build_analysis
+from analysis.streaming import IndicatorState
+from analysis.sentiment import get_market_sentiment
+
+
+def build_watchlist_analysis(symbols, period='1y', provider=None):
+    """
+    Analyze every watchlist symbol from one batched history request
+    """
+    provider = provider or get_data_provider()
+    history = provider.get_history(symbols, period=period)
+    indicators = {}
+    for symbol in symbols:
+        df = history.get(symbol)
+        if df is None or df.empty:
+            continue
+        try:
+            analysis = summarize_stock(symbol, df.copy())
+        except Exception as e:
+            print(f"Error analyzing {symbol}: {str(e)}")
+            continue
+        if analysis is not None:
+            indicators[symbol] = analysis
+    return indicators
+
+
+class WatchlistTracker:
+    """
+    Incremental watchlist analysis on top of the bar store.
+
+    A symbol is analyzed once from its stored history, and an IndicatorState
+    is seeded with every bar but the last, which may be a partial session.
+    Each later update reads only the bars from the last committed one
+    onwards, feeds the complete ones to the state in O(1) per bar and
+    evaluates the newest bar on a copy of the state. A symbol whose stored
+    closes no longer match the state (the store reloaded a re-adjusted
+    history) is seeded again.
+    """
+
+    def __init__(self, period='1y', store=None):
+        self.period = period
+        self.store = store or get_bar_store()
+        self.states = {}
+        self.committed = {}
+        self.analyses = {}
+
+    def _seed(self, symbol):
+        df = self.store.read_period(symbol, self.period)
+        if len(df) < 2:
+            return None
+        analysis = summarize_stock(symbol, df)
+        if analysis is None:
+            return None
+        self.states[symbol] = IndicatorState.from_history(df['Close'].iloc[:-1])
+        self.committed[symbol] = df.index[-2]
+        self.analyses[symbol] = analysis
+        return analysis
+
+    def _advance(self, symbol):
+        state = self.states[symbol]
+        committed = self.committed[symbol]
+        bars = self.store.read(symbol, start=committed)
+        if bars.empty or bars.index[0] != committed or \
+                not math.isclose(bars['Close'].iloc[0], state.close, rel_tol=ADJUSTMENT_TOLERANCE):
+            return self._seed(symbol)
+        bars = bars.iloc[1:]
+        if bars.empty:
+            return self.analyses[symbol]
+
+        rows = [state.update(float(close), ts) for ts, close in zip(bars.index[:-1], bars['Close'].iloc[:-1])]
+        if len(bars) > 1:
+            self.committed[symbol] = bars.index[-2]
+        # The newest bar may still change, so it is applied to a copy of the state
+        preview = IndicatorState.from_dict(state.to_dict())
+        rows.append(preview.update(float(bars['Close'].iloc[-1]), bars.index[-1]))
+
+        previous = self.analyses[symbol]['technical_data']
+        new = pd.DataFrame(rows, index=bars.index)
+        for column in OHLCV_COLUMNS:
+            new[column] = bars[column]
+        data = pd.concat([previous[previous.index < bars.index[0]], new[previous.columns]])
+        data = data[data.index >= pd.Timestamp(datetime.utcnow()) - period_to_offset(self.period)]
+        self.analyses[symbol] = build_analysis(symbol, data)
+        return self.analyses[symbol]
+
+    def update(self, symbols):
+        """
+        Bring the bar store and the analysis of each symbol up to date.
+        Returns {symbol: analysis} for the symbols the store could refresh.
+        """
+        written = self.store.refresh(symbols, period=self.period)
+        analyses = {}
+        for symbol in symbols:
+            if symbol not in written:
+                continue
+            try:
+                analysis = self._advance(symbol) if symbol in self.states else self._seed(symbol)
+            except Exception as e:
+                print(f"Error analyzing {symbol}: {str(e)}")
+                continue
+            if analysis is not None:
+                analyses[symbol] = analysis
+        return analyses
+
+
+def refresh_snapshot(watchlist=None, provider=None, tracker=None):
+    """
+    Rebuild the market snapshot and publish it.
+
+    Each part is computed independently; a part that fails keeps the value
+    and as_of timestamp from the previous snapshot, so readers never lose
+    data to a provider error and still see how old it is. With a
+    WatchlistTracker the watchlist indicators are updated incrementally from
+    the bar store instead of recomputed from the full history.
+    """
+    watchlist = SNAPSHOT_WATCHLIST if watchlist is None else watchlist
+    previous = get_current_snapshot()
+    errors = {}
+    as_of = dict(previous.as_of) if previous is not None else {}
+    indicators_as_of = dict(previous.indicators_as_of) if previous is not None else {}
+
+    panel = previous.panel if previous is not None else None
+    market_analysis = dict(previous.market_analysis) if previous is not None else {}
+    try:
+        fresh_panel = load_price_panel(MARKET_PANEL_SYMBOLS, provider=provider)
+        if fresh_panel.dropna(how='all').empty:
+            raise ValueError("No market data returned")
+        panel = fresh_panel
+        # Only bars newer than the last refresh are fed to the moment engine
+        moments = update_market_moments(panel)
+        market_analysis = build_market_analysis(panel)
+        # asset_correlation stays the sample correlation from build_market_analysis so
+        # suggestions don't depend on whether the refresher has run; the engine's
+        # moments are published alongside it
+        if moments is not None and all(symbol in moments.symbols for symbol in ASSET_CLASS_SYMBOLS):
+            market_analysis['moment_correlation'] = moments.correlation_frame(list(ASSET_CLASS_SYMBOLS))
+        as_of['market_analysis'] = datetime.now()
+    except Exception as e:
+        print(f"Error refreshing market analysis: {str(e)}")
+        errors['market_analysis'] = str(e)
+
+    indicators = dict(previous.indicators) if previous is not None else {}
+    try:
+        if tracker is not None:
+            fresh = tracker.update(watchlist)
+        else:
+            fresh = build_watchlist_analysis(watchlist, provider=provider)
+        indicators.update(fresh)
+        indicators_as_of.update(dict.fromkeys(fresh, datetime.now()))
+    except Exception as e:
+        print(f"Error refreshing watchlist indicators: {str(e)}")
+        errors['indicators'] = str(e)
+
+    sentiment = previous.sentiment if previous is not None else None
+    try:
+        fresh = get_market_sentiment(use_snapshot=False)
+        if fresh:
+            sentiment = fresh
+            as_of['sentiment'] = datetime.now()
+    except Exception as e:
+        print(f"Error refreshing market sentiment: {str(e)}")
+        errors['sentiment'] = str(e)
+
+    return publish_snapshot(panel, market_analysis, indicators, sentiment, errors, as_of, indicators_as_of)
+
+
+class SnapshotRefresher:
+    """
+    Rebuild the market snapshot every interval seconds on a daemon thread
+    """
+
+    def __init__(self, interval=SCRAPING_INTERVAL, watchlist=None, provider=None):
+        self.interval = interval
+        self.watchlist = watchlist
+        self.provider = provider
+        self.tracker = None
+        if BAR_STORE_ENABLED:
+            self.tracker = WatchlistTracker(store=BarStore(provider=provider) if provider else None)
+        self.scheduler = schedule.Scheduler()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """
+        Run one refresh, skipping it if the previous one is still running
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return None
+        try:
+            return refresh_snapshot(self.watchlist, self.provider, self.tracker)
+        except Exception as e:
+            print(f"Error refreshing market snapshot: {str(e)}")
+            return None
+        finally:
+            self._refresh_lock.release()
+
+    def _run(self, run_now):
+        if run_now:
+            self.refresh()
+        while not self._stop.is_set():
+            self.scheduler.run_pending()
+            self._stop.wait(1)
+
+    def start(self, run_now=True):
+        """
+        Start the background thread; by default the first refresh runs immediately
+        """
+        if self.is_running():
+            return self
+        self._stop.clear()
+        self.scheduler.clear()
+        self.scheduler.every(self.interval).seconds.do(self.refresh)
+        self._thread = threading.Thread(target=self._run, args=(run_now,), name='snapshot-refresher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """
+        Stop the background thread
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.scheduler.clear()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def start_snapshot_refresher(interval=SCRAPING_INTERVAL, watchlist=None):
+    """
+    Start the process-wide snapshot refresher once and return it
+    """
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = SnapshotRefresher(interval=interval, watchlist=watchlist)
+        return _refresher.start()
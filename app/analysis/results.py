@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Keys of the analyze_stock dict, in order
+ANALYSIS_KEYS = ['symbol', 'current_price', 'signals', 'volatility', 'returns', 'technical_data']
+
+
+class CompactAnalysis:
+    """
+    Memory-light stand-in for the analyze_stock dict.
+
+    Scalar summaries and signals are kept as attributes and the history as
+    one contiguous float32 block of shape (columns x time), so a column or
+    a time slice is a zero-copy read-only view. technical_data builds a
+    DataFrame only when asked. Supports analysis['key'] lookups like the dict.
+    """
+
+    __slots__ = ('symbol', 'current_price', 'signals', 'volatility', 'returns', 'index', 'columns', 'values')
+
+    def __init__(self, symbol, current_price, signals, volatility, returns, index, columns, values):
+        self.symbol = symbol
+        self.current_price = current_price
+        self.signals = signals
+        self.volatility = volatility
+        self.returns = returns
+        self.index = index
+        self.columns = tuple(columns)
+        self.values = values
+        self.values.flags.writeable = False
+
+    @classmethod
+    def from_analysis(cls, analysis):
+        """
+        Build from an analyze_stock dict; non-numeric columns are dropped
+        """
+        df = analysis['technical_data'].select_dtypes(include='number')
+        values = np.ascontiguousarray(df.to_numpy(dtype=np.float32).T)
+        return cls(
+            analysis['symbol'],
+            float(analysis['current_price']),
+            dict(analysis['signals']),
+            float(analysis['volatility']),
+            float(analysis['returns']),
+            df.index,
+            df.columns,
+            values
+        )
+
+    def column(self, name):
+        """
+        Zero-copy view of one column's history
+        """
+        return self.values[self.columns.index(name)]
+
+    def window(self, start=None, stop=None):
+        """
+        Zero-copy (columns x time) view of a slice of bars
+        """
+        return self.values[:, start:stop]
+
+    def to_frame(self, start=None, stop=None):
+        """
+        DataFrame of the history (or a slice of bars), as the UI expects
+        """
+        return pd.DataFrame(self.values[:, start:stop].T, index=self.index[start:stop], columns=list(self.columns))
+
+    @property
+    def technical_data(self):
+        return self.to_frame()
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.index.nbytes
+
+    def __getitem__(self, key):
+        if key not in ANALYSIS_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in ANALYSIS_KEYS
+
+    def get(self, key, default=None):
+        return self[key] if key in ANALYSIS_KEYS else default
+
+    def keys(self):
+        return list(ANALYSIS_KEYS)
+
+    def to_dict(self):
+        return {key: self[key] for key in ANALYSIS_KEYS}
+
+    def __repr__(self):
+        return f"CompactAnalysis(symbol={self.symbol!r}, bars={self.values.shape[1]}, columns={len(self.columns)})"
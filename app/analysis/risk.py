@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+from utils.constants import SECTOR_ETFS
+
+# Instrument used to represent each asset class in the allocation
+ASSET_CLASS_INSTRUMENTS = {
+    'equity': 'SPY',
+    'commodities': 'DBC',
+    'forex': 'UUP',
+    'fixed_income': 'TLT'
+}
+
+TRADING_DAYS = 252
+
+
+def estimate_moments(panel):
+    """
+    Annualized expected returns and covariance (both in percent units, like
+    sector_performance) from a close-price panel
+    """
+    returns = panel.pct_change(fill_method=None).dropna(how='all')
+    expected_returns = returns.mean() * TRADING_DAYS * 100
+    covariance = returns.cov() * TRADING_DAYS * 100 ** 2
+    return expected_returns.fillna(0.0), covariance.fillna(0.0)
+
+
+def instrument_weights(allocation, sector_breakdown=None):
+    """
+    Map an asset-class allocation (and optional equity sector breakdown) to
+    weights per instrument. Equity not covered by sectors is held in SPY.
+    """
+    weights = {}
+    equity = allocation.get('equity', 0.0)
+    for sector, weight in (sector_breakdown or {}).items():
+        if sector in SECTOR_ETFS:
+            weights[SECTOR_ETFS[sector]] = weights.get(SECTOR_ETFS[sector], 0.0) + weight
+            equity -= weight
+    for asset_class, weight in allocation.items():
+        instrument = ASSET_CLASS_INSTRUMENTS.get(asset_class)
+        if instrument is None:
+            continue
+        if asset_class == 'equity':
+            weight = equity
+        if abs(weight) > 1e-12:
+            weights[instrument] = weights.get(instrument, 0.0) + weight
+    return pd.Series(weights, dtype=float)
+
+
+def weight_matrix(portfolios, instruments):
+    """
+    Stack many (allocation, sector_breakdown) pairs into an (M x K) weight
+    matrix over the given instruments
+    """
+    rows = [
+        instrument_weights(allocation, sector_breakdown).reindex(instruments, fill_value=0.0).to_numpy()
+        for allocation, sector_breakdown in portfolios
+    ]
+    return np.vstack(rows) if rows else np.zeros((0, len(instruments)))
+
+
+def risk_metrics(weights, expected_returns, covariance, risk_free_rate=2.0):
+    """
+    Expected return, volatility sqrt(w'Sw), marginal and component risk
+    contributions and Sharpe ratio for one weight vector (K,) or a stack of
+    weight vectors (M x K), all computed as matrix operations.
+    """
+    weights = np.asarray(weights, dtype=float)
+    single = weights.ndim == 1
+    W = np.atleast_2d(weights)
+    mu = np.asarray(expected_returns, dtype=float)
+    sigma = np.asarray(covariance, dtype=float)
+
+    expected_return = W @ mu
+    sigma_w = W @ sigma
+    variance = np.einsum('mk,mk->m', sigma_w, W)
+    volatility = np.sqrt(np.maximum(variance, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        marginal = np.where(volatility[:, None] > 0, sigma_w / volatility[:, None], 0.0)
+        sharpe = np.where(volatility > 0, (expected_return - risk_free_rate) / volatility, 0.0)
+    component = W * marginal
+
+    metrics = {
+        'expected_return': expected_return,
+        'volatility': volatility,
+        'sharpe_ratio': sharpe,
+        'marginal_risk': marginal,
+        'component_risk': component
+    }
+    if single:
+        metrics = {name: values[0] for name, values in metrics.items()}
+    return metrics
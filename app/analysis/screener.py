@@ -0,0 +1,123 @@
+import operator
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from config import SCREENER_BATCH_SIZE, SCREENER_MAX_WORKERS
+from data.providers import get_data_provider
+from analysis.indicators import compute_indicators, INDICATOR_COLUMNS
+from analysis.technical import get_trading_signals
+
+SIGNAL_COLUMNS = ['RSI_Signal', 'MACD_Signal', 'MA_Signal', 'BB_Signal']
+
+# The MACD signal line shares its name with the MACD signal label, so the
+# result table stores the line's value as 'MACD_Signal_Line'
+VALUE_COLUMNS = ['Close'] + ['MACD_Signal_Line' if name == 'MACD_Signal' else name for name in INDICATOR_COLUMNS]
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+
+def _matches(value, condition):
+    """
+    Check one value against a filter condition: an (operator, operand) tuple,
+    a list or set of allowed values, or a single value to equal
+    """
+    if isinstance(condition, tuple) and len(condition) == 2 and condition[0] in OPERATORS:
+        return OPERATORS[condition[0]](value, condition[1])
+    if isinstance(condition, (list, set, frozenset)):
+        return value in condition
+    return value == condition
+
+
+def matches_filters(row, filters):
+    """
+    True if the row satisfies every {column: condition} filter
+    """
+    return all(
+        column in row and _matches(row[column], condition)
+        for column, condition in (filters or {}).items()
+    )
+
+
+def _screen_batch(symbols, filters, period, provider):
+    """
+    Fetch one batch, compute indicators for all of its symbols in a single
+    vectorized pass and return only the matching rows of last values and
+    signals. Symbols without enough history for every indicator are skipped.
+    """
+    try:
+        history = provider.get_history(symbols, period=period)
+    except Exception as e:
+        print(f"Error fetching screener batch: {str(e)}")
+        return []
+
+    closes = pd.DataFrame({
+        symbol: frame['Close']
+        for symbol, frame in history.items()
+        if 'Close' in frame
+    })
+    del history
+    if closes.empty:
+        return []
+
+    closes = closes.sort_index()
+    columns = list(closes.columns)
+    values = closes.to_numpy(dtype=float)
+    del closes
+
+    # Only the last row of each indicator is kept
+    indicators = compute_indicators(values)
+    last_close = pd.DataFrame(values).ffill().to_numpy()[-1]
+    last_values = np.column_stack([last_close] + [indicators[name][-1] for name in INDICATOR_COLUMNS])
+    del indicators, values
+
+    rows = []
+    for symbol, row_values in zip(columns, last_values):
+        if np.isnan(row_values).any():
+            continue
+        signals = get_trading_signals(dict(zip(['Close'] + INDICATOR_COLUMNS, row_values)))
+        row = dict(zip(VALUE_COLUMNS, row_values.tolist()))
+        row.update(signals)
+        if matches_filters(row, filters):
+            row['symbol'] = symbol
+            rows.append(row)
+    return rows
+
+
+def screen(symbols, filters=None, period='1y', batch_size=SCREENER_BATCH_SIZE,
+           max_workers=SCREENER_MAX_WORKERS, provider=None):
+    """
+    Screen a symbol universe for indicator and signal conditions.
+
+    filters maps result columns (e.g. 'RSI', 'RSI_Signal', 'MA_Signal') to a
+    condition: a single value to equal, a list of allowed values, or an
+    (operator, operand) tuple such as ('<', 35). All conditions must hold.
+
+    Batches are processed on a thread pool and each batch's indicators are
+    computed in one vectorized pass. The provider serializes its downloads
+    (yfinance is not thread-safe), so one batch's download overlaps with
+    other batches' indicator computation rather than with other downloads.
+
+    Returns a compact DataFrame indexed by symbol with the last close, last
+    indicator values and signals; the price histories are discarded as soon
+    as each batch is reduced.
+    """
+    provider = provider or get_data_provider()
+    symbols = list(dict.fromkeys(symbols))
+    batches = [symbols[start:start + batch_size] for start in range(0, len(symbols), batch_size)]
+
+    rows = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for batch_rows in pool.map(lambda batch: _screen_batch(batch, filters, period, provider), batches):
+            rows.extend(batch_rows)
+
+    columns = VALUE_COLUMNS + SIGNAL_COLUMNS
+    if not rows:
+        return pd.DataFrame(columns=columns, index=pd.Index([], name='symbol'))
+    return pd.DataFrame(rows).set_index('symbol')[columns]
@@ -1,31 +1,63 @@
 import pandas as pd
 import numpy as np
 from newsapi import NewsApiClient
-from transformers import pipeline
-import spacy
 from datetime import datetime, timedelta
-from config import NEWS_API_KEY
+from config import (
+    NEWS_API_KEY, SENTIMENT_MODEL, SENTIMENT_BACKEND, SENTIMENT_BATCH_SIZE, SENTIMENT_MAX_LENGTH,
+    SPACY_MODEL, SPACY_EXCLUDED_PIPES, SPACY_BATCH_SIZE, SPACY_N_PROCESS,
+    SENTIMENT_CACHE_ENABLED, SNAPSHOT_MAX_AGE
+)
+from utils.cache import cached
+from data.sentiment_store import article_key, get_sentiment_store
+from data.news import fetch_news, merge_articles
+from data.snapshot import get_current_snapshot
+from utils.model_registry import registry
+from utils.metrics import span, timed, record_error, record_provider_call
 
 # Initialize News API client
 newsapi = NewsApiClient(api_key=NEWS_API_KEY)
 
-# Load spaCy model
-try:
-    nlp = spacy.load('en_core_web_sm')
-except:
-    print("Downloading spaCy model...")
-    spacy.cli.download('en_core_web_sm')
-    nlp = spacy.load('en_core_web_sm')
+# Entity types kept from spaCy NER
+ENTITY_LABELS = ['ORG', 'PERSON', 'GPE', 'MONEY']
 
-# Initialize sentiment analyzer
-sentiment_analyzer = pipeline("sentiment-analysis", model="finiteautomata/bertweet-base-sentiment-analysis")
+def _load_spacy_ner():
+    """
+    Load the spaCy model, trimmed to the NER component
+    """
+    import spacy
+    try:
+        return spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDED_PIPES)
+    except OSError:
+        print("Downloading spaCy model...")
+        spacy.cli.download(SPACY_MODEL)
+        return spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDED_PIPES)
+
+def _load_sentiment_analyzer():
+    """
+    Load the sentiment analysis pipeline for the configured backend
+    """
+    from analysis.sentiment_backends import load_sentiment_pipeline
+    return load_sentiment_pipeline(SENTIMENT_BACKEND, SENTIMENT_MODEL)
+
+# Models are loaded on first use, not at import time
+registry.register('spacy_ner', _load_spacy_ner)
+registry.register('sentiment', _load_sentiment_analyzer)
 
+def warm_sentiment_models(background=True):
+    """
+    Load the sentiment and NER models ahead of the first request
+    """
+    return registry.warm(['sentiment', 'spacy_ner'], background=background)
+
+@cached('news_data')
+@timed('sentiment.fetch')
 def get_news_articles(query, days=7):
     """
     Fetch news articles related to the query
     """
     try:
         from_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        record_provider_call('newsapi', 'everything')
         articles = newsapi.get_everything(
             q=query,
             from_param=from_date,
@@ -34,6 +66,7 @@ def get_news_articles(query, days=7):
         )
         return articles['articles']
     except Exception as e:
+        record_error('sentiment.fetch')
         print(f"Error fetching news: {str(e)}")
         return []
 
@@ -41,30 +74,143 @@ def analyze_text_sentiment(text):
     """
     Analyze sentiment of a given text using BERT
     """
+    return analyze_texts_sentiment([text], batch_size=1)[0]
+
+def _token_lengths(texts, max_length):
+    """
+    Token count of each text, falling back to character length
+    """
     try:
-        result = sentiment_analyzer(text)[0]
-        return {
-            'sentiment': result['label'],
-            'score': result['score']
-        }
-    except Exception as e:
-        print(f"Error analyzing sentiment: {str(e)}")
-        return None
+        encoded = registry.get('sentiment').tokenizer(texts, truncation=True, max_length=max_length)
+        return [len(ids) for ids in encoded['input_ids']]
+    except Exception:
+        return [len(text) for text in texts]
+
+@timed('sentiment.inference')
+def analyze_texts_sentiment(texts, batch_size=SENTIMENT_BATCH_SIZE, max_length=SENTIMENT_MAX_LENGTH):
+    """
+    Analyze sentiment of many texts using batched BERT inference.
+    
+    Texts are sorted by token length and split into buckets of batch_size,
+    so each forward pass pads to a similar length. Results are returned in
+    input order, with None for texts that could not be scored.
+    """
+    texts = list(texts)
+    results = [None] * len(texts)
+    if not texts:
+        return results
+    
+    sentiment_analyzer = registry.get('sentiment')
+    lengths = _token_lengths(texts, max_length)
+    order = sorted(range(len(texts)), key=lambda i: lengths[i])
+    
+    for start in range(0, len(order), batch_size):
+        bucket = order[start:start + batch_size]
+        try:
+            outputs = sentiment_analyzer(
+                [texts[i] for i in bucket],
+                batch_size=len(bucket),
+                truncation=True,
+                max_length=max_length
+            )
+        except Exception as e:
+            record_error('sentiment.inference')
+            print(f"Error analyzing sentiment: {str(e)}")
+            continue
+        
+        for i, output in zip(bucket, outputs):
+            results[i] = {
+                'sentiment': output['label'],
+                'score': output['score']
+            }
+    
+    return results
 
 def extract_key_entities(text):
     """
     Extract key entities from text using spaCy
     """
-    doc = nlp(text)
+    return _entities_from_doc(registry.get('spacy_ner')(text))
+
+def _entities_from_doc(doc):
     entities = []
     for ent in doc.ents:
-        if ent.label_ in ['ORG', 'PERSON', 'GPE', 'MONEY']:
+        if ent.label_ in ENTITY_LABELS:
             entities.append({
                 'text': ent.text,
                 'label': ent.label_
             })
     return entities
 
+@timed('sentiment.entities')
+def extract_entities_bulk(texts, batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS):
+    """
+    Extract key entities from many texts by streaming them through nlp.pipe.
+    Results are aligned with the input order.
+    """
+    docs = registry.get('spacy_ner').pipe(texts, batch_size=batch_size, n_process=n_process)
+    return [_entities_from_doc(doc) for doc in docs]
+
+def sentiment_model_version():
+    """
+    Identifier for the models and settings that produce article results
+    """
+    return f"{SENTIMENT_MODEL}|{SENTIMENT_BACKEND}|max_length={SENTIMENT_MAX_LENGTH}|{SPACY_MODEL}"
+
+@timed('sentiment.score')
+def score_articles(articles):
+    """
+    Get sentiment and entities for each article, aligned with the input.
+    
+    Results already in the sentiment store for the current model version
+    are reused; only unseen articles go through the models. Articles that
+    could not be scored map to None.
+    """
+    keys = [article_key(article) for article in articles]
+    version = sentiment_model_version()
+    store = get_sentiment_store() if SENTIMENT_CACHE_ENABLED else None
+    
+    known = {}
+    if store is not None:
+        try:
+            known = store.get_many(keys, version)
+        except Exception as e:
+            print(f"Error reading sentiment cache: {str(e)}")
+    
+    # Combine title and description for analysis, once per unseen article
+    pending = {}
+    for key, article in zip(keys, articles):
+        if key not in known and key not in pending:
+            pending[key] = f"{article['title']} {article['description']}"
+    
+    if pending:
+        pending_keys = list(pending.keys())
+        texts = list(pending.values())
+        
+        # Score all unseen articles in length-bucketed batches
+        sentiments = analyze_texts_sentiment(texts)
+        
+        # Extract entities for every scored article in one pass
+        scored = [i for i, sentiment in enumerate(sentiments) if sentiment]
+        entities = extract_entities_bulk([texts[i] for i in scored])
+        
+        new_results = {}
+        for i, article_entities in zip(scored, entities):
+            new_results[pending_keys[i]] = {
+                'sentiment': sentiments[i]['sentiment'],
+                'score': sentiments[i]['score'],
+                'entities': article_entities
+            }
+        known.update(new_results)
+        
+        if store is not None:
+            try:
+                store.put_many(new_results, version)
+            except Exception as e:
+                print(f"Error writing sentiment cache: {str(e)}")
+    
+    return [known.get(key) for key in keys]
+
 def analyze_news_sentiment(query, days=7):
     """
     Perform complete news sentiment analysis
@@ -74,25 +220,22 @@ def analyze_news_sentiment(query, days=7):
     if not articles:
         return None
     
-    # Analyze each article
+    return summarize_sentiment(articles, score_articles(articles))
+
+def summarize_sentiment(articles, results):
+    """
+    Build the per-article records and aggregate percentages for scored articles
+    """
     sentiment_results = []
-    for article in articles:
-        # Combine title and description for analysis
-        text = f"{article['title']} {article['description']}"
-        
-        # Get sentiment
-        sentiment = analyze_text_sentiment(text)
-        if sentiment:
-            # Extract entities
-            entities = extract_key_entities(text)
-            
+    for article, result in zip(articles, results):
+        if result:
             sentiment_results.append({
                 'title': article['title'],
                 'source': article['source']['name'],
                 'published_at': article['publishedAt'],
-                'sentiment': sentiment['sentiment'],
-                'sentiment_score': sentiment['score'],
-                'entities': entities,
+                'sentiment': result['sentiment'],
+                'sentiment_score': result['score'],
+                'entities': result['entities'],
                 'url': article['url']
             })
     
@@ -112,10 +255,16 @@ def analyze_news_sentiment(query, days=7):
     
     return None
 
-def get_market_sentiment():
+def get_market_sentiment(use_snapshot=True):
     """
-    Get overall market sentiment by analyzing multiple market-related queries
+    Get overall market sentiment by analyzing multiple market-related queries.
+    The background market snapshot is used when it has a recent result.
     """
+    if use_snapshot:
+        snapshot = get_current_snapshot(max_age=SNAPSHOT_MAX_AGE, part='sentiment')
+        if snapshot is not None and snapshot.sentiment is not None:
+            return snapshot.sentiment
+    
     queries = [
         'stock market',
         'economy',
@@ -124,9 +273,19 @@ def get_market_sentiment():
         'federal reserve'
     ]
     
+    # Fetch all queries concurrently and score each distinct article once
+    with span('sentiment.fetch'):
+        articles_by_query = fetch_news(queries, days=3)
+    articles, membership = merge_articles(articles_by_query)
+    results = score_articles(articles)
+    
     all_sentiments = []
     for query in queries:
-        sentiment = analyze_news_sentiment(query, days=3)
+        indices = membership[query]
+        sentiment = summarize_sentiment(
+            [articles[i] for i in indices],
+            [results[i] for i in indices]
+        )
         if sentiment:
             all_sentiments.append(sentiment)
     
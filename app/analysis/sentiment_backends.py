@@ -0,0 +1,140 @@
+import os
+import time
+from config import SENTIMENT_MODEL, SENTIMENT_BACKEND, SENTIMENT_ONNX_DIR
+
+# Fixed sample used to measure drift of each backend against fp32 PyTorch
+BENCHMARK_HEADLINES = [
+    "Stocks rally as inflation cools more than expected",
+    "Federal Reserve holds interest rates steady, signals patience",
+    "Tech shares tumble after disappointing earnings guidance",
+    "Oil prices surge on supply concerns in the Middle East",
+    "Bank stocks slide as regional lender reports heavy losses",
+    "Retail sales beat forecasts, pointing to resilient consumers",
+    "Treasury yields climb to a 16-year high",
+    "Gold steadies as the dollar weakens",
+    "Unemployment rate ticks up for a second straight month",
+    "Chipmaker raises full-year outlook on strong AI demand",
+    "Markets end flat ahead of the jobs report",
+    "Housing starts fall sharply as mortgage rates bite",
+    "Consumer confidence drops to lowest level this year",
+    "Automaker recalls two million vehicles over safety defect",
+    "Central bank cuts rates for the first time in four years",
+    "Manufacturing activity contracts for the sixth month",
+    "Shares of the airline soar after record summer bookings",
+    "Analysts see limited upside for the index after strong run",
+    "Crypto exchange files for bankruptcy protection",
+    "Dividend hike lifts utility stocks to record highs"
+]
+
+
+def load_pytorch_pipeline(model_name=SENTIMENT_MODEL):
+    """
+    Full precision (fp32) PyTorch pipeline
+    """
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model=model_name)
+
+
+def load_quantized_pipeline(model_name=SENTIMENT_MODEL):
+    """
+    PyTorch pipeline with Linear layers dynamically quantized to int8
+    """
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+
+def load_onnx_pipeline(model_name=SENTIMENT_MODEL, export_dir=SENTIMENT_ONNX_DIR):
+    """
+    ONNX Runtime pipeline; the model is exported once and reused from export_dir
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError:
+        raise ImportError("The 'onnx' sentiment backend requires optimum: pip install optimum[onnxruntime]")
+    from transformers import AutoTokenizer, pipeline
+
+    model_dir = os.path.join(export_dir, model_name.replace('/', '--'))
+    if os.path.isdir(model_dir):
+        model = ORTModelForSequenceClassification.from_pretrained(model_dir)
+        tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    else:
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(model_dir)
+        tokenizer.save_pretrained(model_dir)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+
+
+BACKENDS = {
+    'pytorch': load_pytorch_pipeline,
+    'quantized': load_quantized_pipeline,
+    'onnx': load_onnx_pipeline
+}
+
+
+def load_sentiment_pipeline(backend=SENTIMENT_BACKEND, model_name=SENTIMENT_MODEL):
+    """
+    Load the sentiment pipeline for the configured inference backend
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{backend}', expected one of {list(BACKENDS)}")
+    return BACKENDS[backend](model_name)
+
+
+def _label_scores(analyzer, texts):
+    outputs = analyzer(texts, top_k=None, truncation=True)
+    return [{item['label']: item['score'] for item in output} for output in outputs]
+
+
+def benchmark_backends(backends=None, texts=None, model_name=SENTIMENT_MODEL, repeats=3):
+    """
+    Compare inference backends against the fp32 PyTorch baseline.
+
+    For each backend reports load time, mean latency per text, the share
+    of texts whose top label matches the baseline, and the mean and max
+    absolute difference in class probabilities.
+    """
+    backends = backends or list(BACKENDS)
+    texts = texts or BENCHMARK_HEADLINES
+    baseline = _label_scores(load_pytorch_pipeline(model_name), texts)
+    baseline_labels = [max(scores, key=scores.get) for scores in baseline]
+
+    report = {}
+    for backend in backends:
+        try:
+            start = time.perf_counter()
+            analyzer = load_sentiment_pipeline(backend, model_name)
+            load_seconds = time.perf_counter() - start
+
+            scores = _label_scores(analyzer, texts)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                _label_scores(analyzer, texts)
+            latency = (time.perf_counter() - start) / (repeats * len(texts))
+        except Exception as e:
+            print(f"Error benchmarking backend '{backend}': {str(e)}")
+            continue
+
+        labels = [max(s, key=s.get) for s in scores]
+        drifts = [
+            abs(s.get(label, 0.0) - base[label])
+            for s, base in zip(scores, baseline)
+            for label in base
+        ]
+        report[backend] = {
+            'load_seconds': load_seconds,
+            'latency_ms_per_text': latency * 1000,
+            'label_agreement': sum(a == b for a, b in zip(labels, baseline_labels)) / len(texts),
+            'mean_score_drift': sum(drifts) / len(drifts),
+            'max_score_drift': max(drifts)
+        }
+    return report
+
+
+if __name__ == "__main__":
+    for backend, metrics in benchmark_backends().items():
+        print(backend, ', '.join(f"{name}={value:.4f}" for name, value in metrics.items()))
@@ -0,0 +1,340 @@
+import json
+import math
+from collections import deque
+from config import TECHNICAL_INDICATORS
+from analysis.indicators import SMA_SHORT, SMA_LONG, EMA_SHORT, EMA_LONG
+
+NAN = float('nan')
+
+
+class StreamingSMA:
+    """
+    Simple moving average kept as a rolling window and running sum
+    """
+
+    # Recompute the running sum from the window every so often to stop
+    # floating point drift from accumulating on long-lived streams
+    RESYNC_EVERY = 1000
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.updates = 0
+
+    def update(self, value):
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(value)
+        self.total += value
+        self.updates += 1
+        if self.updates % self.RESYNC_EVERY == 0:
+            self.total = math.fsum(self.window)
+        return self.value
+
+    @property
+    def ready(self):
+        return len(self.window) == self.period
+
+    @property
+    def value(self):
+        return self.total / self.period if self.ready else NAN
+
+    def to_dict(self):
+        return {'period': self.period, 'window': list(self.window), 'updates': self.updates}
+
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls(data['period'])
+        obj.window.extend(data['window'])
+        obj.total = math.fsum(obj.window)
+        obj.updates = data['updates']
+        return obj
+
+
+class StreamingEMA:
+    """
+    Exponential moving average (adjust=False) that becomes ready after
+    min_periods updates. Uses span smoothing unless alpha is given.
+    """
+
+    def __init__(self, period, alpha=None):
+        self.period = period
+        self.alpha = alpha if alpha is not None else 2.0 / (period + 1)
+        self.mean = None
+        self.count = 0
+
+    def update(self, value):
+        if self.mean is None:
+            self.mean = value
+        else:
+            self.mean += self.alpha * (value - self.mean)
+        self.count += 1
+        return self.value
+
+    @property
+    def ready(self):
+        return self.count >= self.period
+
+    @property
+    def value(self):
+        return self.mean if self.ready else NAN
+
+    def to_dict(self):
+        return {'period': self.period, 'alpha': self.alpha, 'mean': self.mean, 'count': self.count}
+
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls(data['period'], alpha=data['alpha'])
+        obj.mean = data['mean']
+        obj.count = data['count']
+        return obj
+
+
+class StreamingRSI:
+    """
+    Relative Strength Index with Wilder smoothing of average gains and losses
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.previous = None
+        self.avg_gain = StreamingEMA(period, alpha=1.0 / period)
+        self.avg_loss = StreamingEMA(period, alpha=1.0 / period)
+
+    def update(self, close):
+        change = 0.0 if self.previous is None else close - self.previous
+        self.previous = close
+        self.avg_gain.update(max(change, 0.0))
+        self.avg_loss.update(max(-change, 0.0))
+        return self.value
+
+    @property
+    def value(self):
+        if not self.avg_loss.ready:
+            return NAN
+        if self.avg_loss.mean == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self.avg_gain.mean / self.avg_loss.mean)
+
+    def to_dict(self):
+        return {
+            'period': self.period,
+            'previous': self.previous,
+            'avg_gain': self.avg_gain.to_dict(),
+            'avg_loss': self.avg_loss.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls(data['period'])
+        obj.previous = data['previous']
+        obj.avg_gain = StreamingEMA.from_dict(data['avg_gain'])
+        obj.avg_loss = StreamingEMA.from_dict(data['avg_loss'])
+        return obj
+
+
+class StreamingMACD:
+    """
+    MACD line, signal line and histogram from fast/slow/signal EMAs
+    """
+
+    def __init__(self, fast, slow, signal):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+
+    def update(self, close):
+        self.fast.update(close)
+        self.slow.update(close)
+        if self.slow.ready:
+            self.signal.update(self.macd)
+        return self.macd
+
+    @property
+    def macd(self):
+        return self.fast.mean - self.slow.mean if self.slow.ready else NAN
+
+    @property
+    def histogram(self):
+        return self.macd - self.signal.value
+
+    def to_dict(self):
+        return {
+            'fast': self.fast.to_dict(),
+            'slow': self.slow.to_dict(),
+            'signal': self.signal.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls.__new__(cls)
+        obj.fast = StreamingEMA.from_dict(data['fast'])
+        obj.slow = StreamingEMA.from_dict(data['slow'])
+        obj.signal = StreamingEMA.from_dict(data['signal'])
+        return obj
+
+
+class StreamingBollinger:
+    """
+    Bollinger Bands from a rolling sum and sum of squares (population std).
+    Values are offset by the first price seen to keep the variance stable.
+    """
+
+    def __init__(self, period, std_dev):
+        self.period = period
+        self.std_dev = std_dev
+        self.anchor = None
+        self.sums = StreamingSMA(period)
+        self.squares = StreamingSMA(period)
+
+    def update(self, close):
+        if self.anchor is None:
+            self.anchor = close
+        offset = close - self.anchor
+        self.sums.update(offset)
+        self.squares.update(offset * offset)
+        return self.middle
+
+    @property
+    def middle(self):
+        return self.sums.value + self.anchor if self.sums.ready else NAN
+
+    @property
+    def width(self):
+        if not self.sums.ready:
+            return NAN
+        mean = self.sums.value
+        return self.std_dev * math.sqrt(max(self.squares.value - mean * mean, 0.0))
+
+    @property
+    def upper(self):
+        return self.middle + self.width
+
+    @property
+    def lower(self):
+        return self.middle - self.width
+
+    def to_dict(self):
+        return {
+            'period': self.period,
+            'std_dev': self.std_dev,
+            'anchor': self.anchor,
+            'sums': self.sums.to_dict(),
+            'squares': self.squares.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls(data['period'], data['std_dev'])
+        obj.anchor = data['anchor']
+        obj.sums = StreamingSMA.from_dict(data['sums'])
+        obj.squares = StreamingSMA.from_dict(data['squares'])
+        return obj
+
+
+class IndicatorState:
+    """
+    Incremental indicator state for one symbol.
+
+    Seed it once from history, then feed each new bar to update() in
+    constant time. latest() returns the same columns that
+    calculate_technical_indicators adds for the last row, so the state can
+    be passed straight to get_trading_signals. to_json()/from_json() let a
+    restarted worker resume without recomputing the history.
+    """
+
+    def __init__(self, params=None):
+        params = params or TECHNICAL_INDICATORS
+        self.params = params
+        self.close = NAN
+        self.last_timestamp = None
+        self.rsi = StreamingRSI(params['RSI']['period'])
+        self.macd = StreamingMACD(params['MACD']['fast'], params['MACD']['slow'], params['MACD']['signal'])
+        self.sma_short = StreamingSMA(params['SMA']['short'])
+        self.sma_long = StreamingSMA(params['SMA']['long'])
+        self.ema_short = StreamingEMA(params['EMA']['short'])
+        self.ema_long = StreamingEMA(params['EMA']['long'])
+        self.bollinger = StreamingBollinger(params['BB']['period'], params['BB']['std_dev'])
+
+    @classmethod
+    def from_history(cls, closes, params=None):
+        """
+        Seed indicator state from a close price Series (or any iterable)
+        """
+        state = cls(params)
+        timestamps = closes.index if hasattr(closes, 'index') else [None] * len(closes)
+        for timestamp, close in zip(timestamps, closes):
+            if close == close:  # skip NaN bars
+                state.update(float(close), timestamp)
+        return state
+
+    def update(self, close, timestamp=None):
+        """
+        Add one new bar and return the latest indicator values
+        """
+        self.close = close
+        if timestamp is not None:
+            self.last_timestamp = str(timestamp)
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.sma_short.update(close)
+        self.sma_long.update(close)
+        self.ema_short.update(close)
+        self.ema_long.update(close)
+        self.bollinger.update(close)
+        return self.latest()
+
+    def latest(self):
+        """
+        Get the current indicator values keyed like the technical DataFrame columns
+        """
+        return {
+            'Close': self.close,
+            'RSI': self.rsi.value,
+            'MACD': self.macd.macd,
+            'MACD_Signal': self.macd.signal.value,
+            'MACD_Histogram': self.macd.histogram,
+            SMA_SHORT: self.sma_short.value,
+            SMA_LONG: self.sma_long.value,
+            EMA_SHORT: self.ema_short.value,
+            EMA_LONG: self.ema_long.value,
+            'BB_Upper': self.bollinger.upper,
+            'BB_Lower': self.bollinger.lower,
+            'BB_Middle': self.bollinger.middle
+        }
+
+    def to_dict(self):
+        return {
+            'params': self.params,
+            'close': None if self.close != self.close else self.close,
+            'last_timestamp': self.last_timestamp,
+            'rsi': self.rsi.to_dict(),
+            'macd': self.macd.to_dict(),
+            'sma_short': self.sma_short.to_dict(),
+            'sma_long': self.sma_long.to_dict(),
+            'ema_short': self.ema_short.to_dict(),
+            'ema_long': self.ema_long.to_dict(),
+            'bollinger': self.bollinger.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data['params'])
+        state.close = NAN if data['close'] is None else data['close']
+        state.last_timestamp = data['last_timestamp']
+        state.rsi = StreamingRSI.from_dict(data['rsi'])
+        state.macd = StreamingMACD.from_dict(data['macd'])
+        state.sma_short = StreamingSMA.from_dict(data['sma_short'])
+        state.sma_long = StreamingSMA.from_dict(data['sma_long'])
+        state.ema_short = StreamingEMA.from_dict(data['ema_short'])
+        state.ema_long = StreamingEMA.from_dict(data['ema_long'])
+        state.bollinger = StreamingBollinger.from_dict(data['bollinger'])
+        return state
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, payload):
+        return cls.from_dict(json.loads(payload))
@@ -0,0 +1,178 @@
+import os
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from config import BACKTEST_COST_BPS, TECHNICAL_INDICATORS
+from analysis.indicators import first_valid, fill_gaps, mask_before, ewm, SMA_SHORT, SMA_LONG
+from analysis.backtest import rule_signals, hold_positions, strategy_returns, portfolio_stats
+
+# Grid parameter names per rule follow the keys of TECHNICAL_INDICATORS
+DEFAULT_GRIDS = {
+    'MA': {'short': range(5, 101, 5), 'long': range(20, 201, 10)},
+    'MACD': {'fast': range(6, 19, 2), 'slow': range(20, 41, 4), 'signal': range(5, 13, 2)},
+    'RSI': {'period': range(5, 31)},
+    'BB': {'period': range(10, 41, 5), 'std_dev': [1.5, 2.0, 2.5, 3.0]}
+}
+
+# Combinations evaluated per task sent to a worker
+CHUNK_SIZE = 16
+
+# Per-process state set up once by _init_worker
+_state = {}
+
+
+class SweepState:
+    """
+    Arrays shared by every combination of a sweep: gap-filled prices,
+    prefix sums of prices and squared (centred) prices, and price changes.
+    Moving averages for any window are O(n) differences of the prefix sums;
+    EWM results are memoized per smoothing factor.
+    """
+
+    def __init__(self, close):
+        self.close = np.asarray(close, dtype=float)
+        self.first = first_valid(self.close)
+        self.prices = fill_gaps(self.close, self.first)
+
+        n = self.prices.shape[1]
+        self.anchor = self.prices[np.minimum(self.first, len(self.prices) - 1), np.arange(n)]
+        centred = self.prices - self.anchor
+        self.csum = np.vstack([np.zeros((1, n)), np.cumsum(centred, axis=0)])
+        self.csum_sq = np.vstack([np.zeros((1, n)), np.cumsum(centred * centred, axis=0)])
+
+        self.diff = np.zeros_like(self.prices)
+        self.diff[1:] = self.prices[1:] - self.prices[:-1]
+        self._ewm_cache = {}
+
+    def _window_mean(self, csum, window):
+        out = np.full(self.prices.shape, np.nan)
+        if len(self.prices) >= window:
+            out[window - 1:] = (csum[window:] - csum[:-window]) / window
+        return out
+
+    def sma(self, window):
+        return mask_before(self._window_mean(self.csum, window) + self.anchor, self.first + window - 1)
+
+    def bollinger(self, window, width):
+        mean = self._window_mean(self.csum, window)
+        variance = np.maximum(self._window_mean(self.csum_sq, window) - mean * mean, 0.0)
+        middle = mask_before(mean + self.anchor, self.first + window - 1)
+        band = width * np.sqrt(variance)
+        return {'BB_Middle': middle, 'BB_Upper': middle + band, 'BB_Lower': middle - band}
+
+    def ewm(self, key, values, alpha):
+        if key not in self._ewm_cache:
+            self._ewm_cache[key] = ewm(values, alpha)
+        return self._ewm_cache[key]
+
+    def rsi(self, period):
+        avg_gain = self.ewm(('gain', period), np.maximum(self.diff, 0.0), 1.0 / period)
+        avg_loss = self.ewm(('loss', period), np.maximum(-self.diff, 0.0), 1.0 / period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+        return mask_before(rsi, self.first + period - 1)
+
+    def macd(self, fast, slow, signal):
+        macd = self.ewm(('ema', fast), self.prices, 2.0 / (fast + 1)) \
+            - self.ewm(('ema', slow), self.prices, 2.0 / (slow + 1))
+        start = self.first + slow - 1
+        macd_signal = ewm(fill_gaps(mask_before(macd.copy(), start), start), 2.0 / (signal + 1))
+        return {
+            'MACD': mask_before(macd, start),
+            'MACD_Signal': mask_before(macd_signal, start + signal - 1)
+        }
+
+    def indicators(self, rule, params):
+        """
+        Only the indicators the rule needs, for one parameter combination
+        """
+        if rule == 'MA':
+            return {SMA_SHORT: self.sma(params['short']), SMA_LONG: self.sma(params['long'])}
+        if rule == 'MACD':
+            return self.macd(params['fast'], params['slow'], params['signal'])
+        if rule == 'RSI':
+            return {'RSI': self.rsi(params['period'])}
+        if rule == 'BB':
+            return self.bollinger(params['period'], params['std_dev'])
+        raise ValueError(f"Unknown rule '{rule}', expected one of {list(DEFAULT_GRIDS)}")
+
+
+def _init_worker(close, rule, cost_bps, long_only, risk_free_rate):
+    _state['sweep'] = SweepState(close)
+    _state['settings'] = (rule, cost_bps, long_only, risk_free_rate)
+
+
+def _evaluate(params):
+    sweep = _state['sweep']
+    rule, cost_bps, long_only, risk_free_rate = _state['settings']
+    indicators = sweep.indicators(rule, params)
+    positions = hold_positions(rule_signals(sweep.close, indicators, rule))
+    if long_only:
+        positions = np.maximum(positions, 0.0)
+    returns, turnover = strategy_returns(sweep.close, positions, cost_bps)
+
+    result = dict(params)
+    result.update(portfolio_stats(pd.Series(returns.mean(axis=1)), risk_free_rate))
+    result['trades'] = int(np.count_nonzero(turnover))
+    return result
+
+
+def _evaluate_chunk(combinations):
+    return [_evaluate(params) for params in combinations]
+
+
+def parameter_grid(rule, grid=None):
+    """
+    Expand a {parameter: values} grid into valid combinations for the rule
+    """
+    grid = grid or DEFAULT_GRIDS[rule]
+    names = list(grid)
+    combinations = []
+    for values in itertools.product(*(list(grid[name]) for name in names)):
+        params = dict(zip(names, values))
+        if rule == 'MA' and params['short'] >= params['long']:
+            continue
+        if rule == 'MACD' and params['fast'] >= params['slow']:
+            continue
+        combinations.append(params)
+    return combinations
+
+
+def sweep(prices, rule='MA', grid=None, cost_bps=BACKTEST_COST_BPS, long_only=True,
+          risk_free_rate=0.02, rank_by='sharpe_ratio', max_workers=None):
+    """
+    Backtest a rule over a grid of indicator periods.
+
+    grid maps parameter names to values, e.g. {'short': range(5, 50),
+    'long': range(50, 201)} for 'MA'; parameters left out use
+    TECHNICAL_INDICATORS. Combinations are spread over worker processes,
+    each of which builds the shared prefix sums once. Returns a DataFrame of
+    parameters and portfolio backtest metrics, best first by rank_by.
+    """
+    if rule not in DEFAULT_GRIDS:
+        raise ValueError(f"Unknown rule '{rule}', expected one of {list(DEFAULT_GRIDS)}")
+    defaults = TECHNICAL_INDICATORS['SMA' if rule == 'MA' else rule]
+    grid = dict(grid or DEFAULT_GRIDS[rule])
+    for name in DEFAULT_GRIDS[rule]:
+        if name not in grid:
+            grid[name] = [defaults[name]]
+    combinations = parameter_grid(rule, grid)
+
+    close = prices.sort_index().to_numpy(dtype=float)
+    settings = (rule, cost_bps, long_only, risk_free_rate)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if max_workers == 1 or len(combinations) <= CHUNK_SIZE:
+        _init_worker(close, *settings)
+        results = _evaluate_chunk(combinations)
+    else:
+        chunks = [combinations[start:start + CHUNK_SIZE] for start in range(0, len(combinations), CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(close,) + settings) as pool:
+            results = [row for rows in pool.map(_evaluate_chunk, chunks) for row in rows]
+
+    table = pd.DataFrame(results)
+    if table.empty:
+        return table
+    return table.sort_values(rank_by, ascending=False).reset_index(drop=True)
@@ -1,22 +1,41 @@
+from collections.abc import Mapping
 import pandas as pd
 import numpy as np
 import yfinance as yf
-from ta.trend import SMAIndicator, EMAIndicator, MACD
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands
+from analysis.indicators import compute_indicators, SMA_SHORT, SMA_LONG
+from analysis.streaming import IndicatorState
+from analysis.results import CompactAnalysis
+from config import BAR_STORE_ENABLED, SNAPSHOT_MAX_AGE
+from utils.cache import cached, copy_value
+from utils.metrics import timed, record_error, record_provider_call
+from data.store import get_bar_store
+from data.providers import YAHOO_LOCK
+from data.snapshot import get_current_snapshot
 
+@cached('market_data', copy_result=True)
+@timed('technical.fetch')
 def get_stock_data(symbol, period='1y'):
     """
-    Fetch stock data from Yahoo Finance
+    Fetch stock data, serving it from the local bar store when enabled
     """
     try:
-        stock = yf.Ticker(symbol)
-        df = stock.history(period=period)
+        if BAR_STORE_ENABLED:
+            store = get_bar_store()
+            store.refresh([symbol], period=period)
+            df = store.read_period(symbol, period)
+            if not df.empty:
+                return df
+        record_provider_call('yahoo', 'ticker_history')
+        # Ticker.history shares yfinance's global state with yf.download
+        with YAHOO_LOCK:
+            df = yf.Ticker(symbol).history(period=period)
         return df
     except Exception as e:
+        record_error('technical.fetch')
         print(f"Error fetching data for {symbol}: {str(e)}")
         return None
 
+@timed('technical.indicators')
 def calculate_technical_indicators(df):
     """
     Calculate various technical indicators for the given stock data
@@ -24,36 +43,27 @@ def calculate_technical_indicators(df):
     if df is None or df.empty:
         return None
     
-    # Calculate RSI
-    rsi = RSIIndicator(close=df['Close'], window=14)
-    df['RSI'] = rsi.rsi()
-    
-    # Calculate MACD
-    macd = MACD(close=df['Close'])
-    df['MACD'] = macd.macd()
-    df['MACD_Signal'] = macd.macd_signal()
-    df['MACD_Histogram'] = macd.macd_diff()
-    
-    # Calculate Moving Averages
-    sma_20 = SMAIndicator(close=df['Close'], window=20)
-    sma_50 = SMAIndicator(close=df['Close'], window=50)
-    df['SMA_20'] = sma_20.sma_indicator()
-    df['SMA_50'] = sma_50.sma_indicator()
-    
-    # Calculate Bollinger Bands
-    bb = BollingerBands(close=df['Close'])
-    df['BB_Upper'] = bb.bollinger_hband()
-    df['BB_Lower'] = bb.bollinger_lband()
-    df['BB_Middle'] = bb.bollinger_mavg()
+    # RSI, MACD, moving averages and Bollinger Bands in one vectorized pass
+    indicators = compute_indicators(df['Close'].to_numpy(dtype=float))
+    for name, values in indicators.items():
+        df[name] = values[:, 0]
     
     return df
 
 def get_trading_signals(df):
     """
-    Generate trading signals based on technical indicators
+    Generate trading signals based on technical indicators.
+    Accepts an indicator DataFrame, a streaming IndicatorState or a
+    mapping of the latest indicator values.
     """
-    if df is None or df.empty:
+    if isinstance(df, IndicatorState):
+        last = df.latest()
+    elif isinstance(df, Mapping):
+        last = df
+    elif df is None or df.empty:
         return None
+    else:
+        last = df.iloc[-1]
     
     signals = {
         'RSI_Signal': 'Neutral',
@@ -63,46 +73,77 @@ def get_trading_signals(df):
     }
     
     # RSI Signals
-    last_rsi = df['RSI'].iloc[-1]
+    last_rsi = last['RSI']
     if last_rsi > 70:
         signals['RSI_Signal'] = 'Overbought'
     elif last_rsi < 30:
         signals['RSI_Signal'] = 'Oversold'
     
     # MACD Signals
-    if df['MACD'].iloc[-1] > df['MACD_Signal'].iloc[-1]:
+    if last['MACD'] > last['MACD_Signal']:
         signals['MACD_Signal'] = 'Bullish'
     else:
         signals['MACD_Signal'] = 'Bearish'
     
     # Moving Average Signals
-    if df['Close'].iloc[-1] > df['SMA_20'].iloc[-1] > df['SMA_50'].iloc[-1]:
+    if last['Close'] > last[SMA_SHORT] > last[SMA_LONG]:
         signals['MA_Signal'] = 'Bullish'
-    elif df['Close'].iloc[-1] < df['SMA_20'].iloc[-1] < df['SMA_50'].iloc[-1]:
+    elif last['Close'] < last[SMA_SHORT] < last[SMA_LONG]:
         signals['MA_Signal'] = 'Bearish'
     
     # Bollinger Bands Signals
-    if df['Close'].iloc[-1] > df['BB_Upper'].iloc[-1]:
+    if last['Close'] > last['BB_Upper']:
         signals['BB_Signal'] = 'Overbought'
-    elif df['Close'].iloc[-1] < df['BB_Lower'].iloc[-1]:
+    elif last['Close'] < last['BB_Lower']:
         signals['BB_Signal'] = 'Oversold'
     
     return signals
 
-def analyze_stock(symbol):
+def analyze_stock(symbol, compact=False):
+    """
+    Perform complete technical analysis for a stock.
+    With compact=True a CompactAnalysis (float32 history) is returned instead of the dict.
+    """
+    # Serve watchlist symbols from the background market snapshot
+    snapshot = get_current_snapshot()
+    if snapshot is not None and symbol in snapshot.indicators and snapshot.indicator_age(symbol) <= SNAPSHOT_MAX_AGE:
+        analysis = snapshot.indicators[symbol]
+        # The snapshot is shared by every reader, so callers get their own copy
+        return CompactAnalysis.from_analysis(analysis) if compact else copy_value(analysis)
+    return _analyze_stock(symbol, compact)
+
+@cached('technical_indicators', copy_result=True)
+def _analyze_stock(symbol, compact=False):
     """
-    Perform complete technical analysis for a stock
+    Fetch stock data and analyze it
     """
     # Get stock data
     df = get_stock_data(symbol)
     if df is None:
         return None
     
+    analysis = summarize_stock(symbol, df)
+    if compact and analysis is not None:
+        # Only the compact form is cached, not the full DataFrame
+        return CompactAnalysis.from_analysis(analysis)
+    return analysis
+
+@timed('technical.analyze')
+def summarize_stock(symbol, df):
+    """
+    Calculate indicators, signals and summary metrics from a symbol's history
+    """
     # Calculate indicators
     df = calculate_technical_indicators(df)
     if df is None:
         return None
     
+    return build_analysis(symbol, df)
+
+def build_analysis(symbol, df):
+    """
+    Assemble the analysis result from a history that already has indicator columns
+    """
     # Get trading signals
     signals = get_trading_signals(df)
     
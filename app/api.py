@@ -0,0 +1,240 @@
+import json
+import math
+import asyncio
+import hashlib
+from datetime import date, datetime
+from functools import partial
+from types import MappingProxyType
+from typing import List, Optional, Dict
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from config import (
+    RISK_LEVELS, INVESTMENT_HORIZONS, SECTORS, PORTFOLIO_OPTIMIZER,
+    API_HOST, API_PORT, API_WORKERS, MODEL_PREWARM, SNAPSHOT_REFRESH_ENABLED
+)
+from utils.constants import CACHE_SETTINGS
+from analysis.technical import analyze_stock
+from analysis.sentiment import analyze_news_sentiment, warm_sentiment_models
+from analysis.portfolio import (
+    generate_portfolio_suggestions, generate_portfolio_suggestions_batch, calculate_portfolio_metrics
+)
+from analysis.optimizer import OPTIMIZER_MODES
+from analysis.refresher import start_snapshot_refresher
+from data.snapshot import get_current_snapshot
+from utils.metrics import render_prometheus
+
+
+def to_jsonable(value):
+    """
+    Convert analysis results (DataFrames, numpy values, timestamps) into
+    plain JSON types. DataFrames use pandas' 'split' layout.
+    """
+    if isinstance(value, pd.DataFrame):
+        return {
+            'index': [to_jsonable(i) for i in value.index],
+            'columns': [str(c) for c in value.columns],
+            'data': to_jsonable(value.to_numpy().tolist())
+        }
+    if isinstance(value, pd.Series):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (dict, MappingProxyType)):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return to_jsonable(value.tolist())
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class RequestCoalescer:
+    """
+    Share one executor computation between identical concurrent requests
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self._inflight = {}
+
+    async def run(self, key, func, *args, **kwargs):
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one client disconnecting does not cancel the shared work
+        return await asyncio.shield(future)
+
+    def inflight(self):
+        return len(self._inflight)
+
+
+executor = ThreadPoolExecutor(max_workers=API_WORKERS, thread_name_prefix='api-worker')
+coalescer = RequestCoalescer(executor)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if MODEL_PREWARM:
+        warm_sentiment_models()
+    if SNAPSHOT_REFRESH_ENABLED:
+        start_snapshot_refresher()
+    yield
+
+
+app = FastAPI(title="AI Stock Market Analyzer API", lifespan=lifespan)
+
+
+def cached_response(request, payload, category, cacheable=True):
+    """
+    Serialize payload with an ETag and Cache-Control max-age from
+    CACHE_SETTINGS (no-store when not cacheable); answer 304 when the
+    client already has this version
+    """
+    body = json.dumps(to_jsonable(payload), separators=(',', ':'), allow_nan=False)
+    etag = '"' + hashlib.sha1(body.encode('utf-8')).hexdigest() + '"'
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f"public, max-age={CACHE_SETTINGS.get(category, 0)}" if cacheable else 'no-store'
+    }
+    if_none_match = request.headers.get('if-none-match', '')
+    if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type='application/json', headers=headers)
+
+
+def _validate_profile(risk_level, investment_horizon, optimizer_mode):
+    if risk_level not in RISK_LEVELS:
+        raise HTTPException(status_code=422, detail=f"risk_level must be one of {list(RISK_LEVELS)}")
+    if investment_horizon not in INVESTMENT_HORIZONS:
+        raise HTTPException(status_code=422, detail=f"investment_horizon must be one of {list(INVESTMENT_HORIZONS)}")
+    if optimizer_mode not in OPTIMIZER_MODES + ['heuristic']:
+        raise HTTPException(status_code=422, detail=f"optimizer_mode must be one of {OPTIMIZER_MODES + ['heuristic']}")
+
+
+class Profile(BaseModel):
+    capital: float = Field(gt=0)
+    risk_level: str
+    investment_horizon: str
+    preferred_sectors: List[str] = []
+
+
+class BatchRequest(BaseModel):
+    profiles: List[Profile]
+    optimizer_mode: str = PORTFOLIO_OPTIMIZER
+
+
+class PortfolioRequest(BaseModel):
+    allocation: Dict[str, float]
+    sector_breakdown: Dict[str, float] = {}
+
+
+@app.get("/health")
+async def health():
+    snapshot = get_current_snapshot()
+    return {
+        'status': 'ok',
+        'snapshot_version': snapshot.version if snapshot is not None else None,
+        'snapshot_age': snapshot.age() if snapshot is not None else None,
+        'snapshot_part_ages': {
+            part: to_jsonable(snapshot.part_age(part)) for part in ('market_analysis', 'sentiment')
+        } if snapshot is not None else None,
+        'inflight': coalescer.inflight()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Stage latencies, provider calls, errors and cache hit ratios for Prometheus
+    """
+    return PlainTextResponse(render_prometheus(), media_type='text/plain; version=0.0.4')
+
+
+@app.get("/stocks/{symbol}")
+async def stock_analysis(request: Request, symbol: str, history: int = Query(0, ge=0)):
+    """
+    Technical analysis for a symbol; history is the number of recent
+    indicator rows to include
+    """
+    symbol = symbol.upper()
+    analysis = await coalescer.run(('stock', symbol), analyze_stock, symbol)
+    if analysis is None:
+        raise HTTPException(status_code=404, detail=f"No data available for {symbol}")
+
+    payload = {key: value for key, value in analysis.items() if key != 'technical_data'}
+    if history:
+        payload['technical_data'] = analysis['technical_data'].tail(history)
+    return cached_response(request, payload, 'technical_indicators')
+
+
+@app.get("/portfolio/suggestions")
+async def portfolio_suggestions(request: Request,
+                                capital: float = Query(..., gt=0),
+                                risk_level: str = 'MEDIUM',
+                                investment_horizon: str = 'MEDIUM_TERM',
+                                preferred_sectors: Optional[List[str]] = Query(None),
+                                optimizer_mode: str = PORTFOLIO_OPTIMIZER):
+    _validate_profile(risk_level, investment_horizon, optimizer_mode)
+    sectors = [sector for sector in (preferred_sectors or []) if sector in SECTORS]
+    key = ('portfolio', capital, risk_level, investment_horizon, tuple(sectors), optimizer_mode)
+    suggestions = await coalescer.run(
+        key, generate_portfolio_suggestions, capital, risk_level, investment_horizon, sectors,
+        optimizer_mode=optimizer_mode
+    )
+    return cached_response(request, suggestions, 'portfolio_analysis', cacheable=not suggestions.get('degraded'))
+
+
+@app.post("/portfolio/suggestions/batch")
+async def portfolio_suggestions_batch(batch: BatchRequest):
+    profiles = []
+    for profile in batch.profiles:
+        _validate_profile(profile.risk_level, profile.investment_horizon, batch.optimizer_mode)
+        sectors = [sector for sector in profile.preferred_sectors if sector in SECTORS]
+        profiles.append((profile.capital, profile.risk_level, profile.investment_horizon, sectors))
+
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(
+        executor, partial(generate_portfolio_suggestions_batch, profiles, optimizer_mode=batch.optimizer_mode)
+    )
+    return to_jsonable(results)
+
+
+@app.post("/portfolio/metrics")
+async def portfolio_metrics(portfolio: PortfolioRequest):
+    request = {
+        'allocation': portfolio.allocation,
+        'sector_breakdown': portfolio.sector_breakdown,
+        'market_analysis': {}
+    }
+    key = ('metrics', tuple(sorted(portfolio.allocation.items())), tuple(sorted(portfolio.sector_breakdown.items())))
+    try:
+        metrics = await coalescer.run(key, calculate_portfolio_metrics, request)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Error calculating portfolio metrics: {str(e)}")
+    return to_jsonable(metrics)
+
+
+@app.get("/news/sentiment")
+async def news_sentiment(request: Request, query: str, days: int = Query(7, ge=1, le=30)):
+    sentiment = await coalescer.run(('sentiment', query, days), analyze_news_sentiment, query, days)
+    if sentiment is None:
+        raise HTTPException(status_code=404, detail=f"No articles found for '{query}'")
+    return cached_response(request, sentiment, 'news_data')
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=API_HOST, port=API_PORT)
@@ -11,11 +11,71 @@ ALPHA_VANTAGE_API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY', '6CB73NPE4ZL1K3KX')
 # Database Configuration
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///./stock_analyzer.db')
 
+# Local OHLCV bar store (kept in DATABASE_URL, refreshed incrementally)
+BAR_STORE_ENABLED = os.getenv('BAR_STORE_ENABLED', 'true').lower() == 'true'
+
 # Scraping Configuration
 SCRAPING_INTERVAL = 3600  # 1 hour in seconds
 MAX_RETRIES = 3
 RETRY_DELAY = 5  # seconds
 
+# Background market snapshot, rebuilt every SCRAPING_INTERVAL seconds
+SNAPSHOT_REFRESH_ENABLED = os.getenv('SNAPSHOT_REFRESH_ENABLED', 'true').lower() == 'true'
+SNAPSHOT_WATCHLIST = os.getenv('SNAPSHOT_WATCHLIST', '^GSPC,^DJI,^IXIC,^RUT').split(',')
+SNAPSHOT_MAX_AGE = int(os.getenv('SNAPSHOT_MAX_AGE', str(2 * SCRAPING_INTERVAL)))  # seconds before a snapshot is ignored
+
+# Instrumentation: set PROFILE_STAGES to capture a cProfile dump per top-level stage
+PROFILE_STAGES = os.getenv('PROFILE_STAGES', 'false').lower() == 'true'
+PROFILE_DIR = os.getenv('PROFILE_DIR', './profiles')
+
+# HTTP API service
+API_HOST = os.getenv('API_HOST', '0.0.0.0')
+API_PORT = int(os.getenv('API_PORT', '8000'))
+API_WORKERS = int(os.getenv('API_WORKERS', '8'))  # threads running blocking analysis work
+
+# Cache Configuration (TTLs per category live in utils.constants.CACHE_SETTINGS)
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '256'))
+CACHE_DIR = os.getenv('CACHE_DIR')  # Set to enable the on-disk cache tier
+
+# Sentiment model inference
+SENTIMENT_MODEL = 'finiteautomata/bertweet-base-sentiment-analysis'
+SENTIMENT_BACKEND = os.getenv('SENTIMENT_BACKEND', 'pytorch')  # 'pytorch', 'quantized' (int8) or 'onnx'
+SENTIMENT_ONNX_DIR = os.getenv('SENTIMENT_ONNX_DIR', './models/onnx')  # 'onnx' needs optimum[onnxruntime] (requirements.txt)
+SENTIMENT_CACHE_ENABLED = os.getenv('SENTIMENT_CACHE_ENABLED', 'true').lower() == 'true'  # per-article results in DATABASE_URL
+MODEL_PREWARM = os.getenv('MODEL_PREWARM', 'false').lower() == 'true'  # load NLP models in the background at startup
+SENTIMENT_BATCH_SIZE = int(os.getenv('SENTIMENT_BATCH_SIZE', '16'))
+SENTIMENT_MAX_LENGTH = int(os.getenv('SENTIMENT_MAX_LENGTH', '128'))  # tokens; BERTweet's limit
+
+# spaCy entity extraction (only NER output is used, so the rest of the pipeline is excluded)
+SPACY_MODEL = 'en_core_web_sm'
+SPACY_EXCLUDED_PIPES = ['tok2vec', 'tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter']
+SPACY_BATCH_SIZE = int(os.getenv('SPACY_BATCH_SIZE', '64'))
+SPACY_N_PROCESS = int(os.getenv('SPACY_N_PROCESS', '1'))
+
+# Incremental correlation / covariance ('ewma', 'window' or 'static' full-history)
+CORRELATION_METHOD = os.getenv('CORRELATION_METHOD', 'ewma')
+CORRELATION_HALFLIFE = int(os.getenv('CORRELATION_HALFLIFE', '63'))  # bars
+CORRELATION_WINDOW = int(os.getenv('CORRELATION_WINDOW', '252'))  # bars
+CORRELATION_DTYPE = os.getenv('CORRELATION_DTYPE', 'float64')  # 'float32' halves memory for large universes
+
+# Backtesting
+BACKTEST_COST_BPS = float(os.getenv('BACKTEST_COST_BPS', '10'))  # cost per unit of turnover, in basis points
+
+# Multi-symbol screener
+SCREENER_BATCH_SIZE = int(os.getenv('SCREENER_BATCH_SIZE', '200'))  # symbols per provider request
+SCREENER_MAX_WORKERS = int(os.getenv('SCREENER_MAX_WORKERS', '4'))
+
+# Shared HTTP client (connection pools, per-host rate limits, conditional GET cache)
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '10'))  # seconds
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))  # keep-alive connections per host
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv('HTTP_CACHE_MAX_ENTRIES', '512'))
+SCRAPE_RATE_LIMIT = float(os.getenv('SCRAPE_RATE_LIMIT', '1'))  # requests per second per news site
+ALPHA_VANTAGE_RATE_LIMIT = float(os.getenv('ALPHA_VANTAGE_RATE_LIMIT', str(5 / 60)))  # free tier: 5 per minute
+
+# Concurrent news fetching
+NEWS_MAX_CONCURRENCY = int(os.getenv('NEWS_MAX_CONCURRENCY', '5'))
+NEWS_RATE_LIMIT = float(os.getenv('NEWS_RATE_LIMIT', '5'))  # request starts per second
+
 # News Sources
 NEWS_SOURCES = [
     'reuters.com',
@@ -23,6 +83,14 @@ NEWS_SOURCES = [
     'moneycontrol.com'
 ]
 
+# Market Data Provider ('yahoo' or 'fixture' for offline runs)
+DATA_PROVIDER = os.getenv('DATA_PROVIDER', 'yahoo')
+FIXTURE_DATA_DIR = os.getenv('FIXTURE_DATA_DIR', './fixtures')
+
+# Portfolio optimizer: 'heuristic' (static risk-level allocation) or, opt-in,
+# 'min_variance', 'max_sharpe' or 'risk_parity'
+PORTFOLIO_OPTIMIZER = os.getenv('PORTFOLIO_OPTIMIZER', 'heuristic')
+
 # Market Data Sources
 MARKET_DATA_SOURCES = {
     'stocks': 'yahoo',
@@ -35,7 +103,8 @@ TECHNICAL_INDICATORS = {
     'RSI': {'period': 14},
     'MACD': {'fast': 12, 'slow': 26, 'signal': 9},
     'SMA': {'short': 20, 'long': 50},
-    'EMA': {'short': 20, 'long': 50}
+    'EMA': {'short': 20, 'long': 50},
+    'BB': {'period': 20, 'std_dev': 2}
 }
 
 # Risk Levels
@@ -0,0 +1,95 @@
+import time
+import asyncio
+from datetime import datetime, timedelta
+from config import NEWS_API_KEY, NEWS_MAX_CONCURRENCY
+from utils.constants import NEWS_API_BASE_URL
+from utils.cache import get_cache
+from utils.http import get_http_client
+from data.sentiment_store import article_key
+from utils.metrics import observe, record_error, record_provider_call
+
+
+async def _get_everything(client, base_url, query, from_date, api_key):
+    record_provider_call('newsapi', 'everything')
+    response = await client.aget(
+        f"{base_url}/everything",
+        params={
+            'q': query,
+            'from': from_date,
+            'language': 'en',
+            'sortBy': 'relevancy'
+        },
+        headers={'X-Api-Key': api_key}
+    )
+    response.raise_for_status()
+    return response.json().get('articles', [])
+
+
+async def _fetch_query(client, query, days, semaphore, base_url, api_key):
+    cache = get_cache('news_data')
+    cache_key = f"news:{base_url}:{query}:{days}"
+    articles = cache.get(cache_key)
+    if articles is not None:
+        return articles
+
+    from_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+    async with semaphore:
+        # Timed directly: spans track nesting per thread, which coroutines share
+        start = time.perf_counter()
+        try:
+            articles = await _get_everything(client, base_url, query, from_date, api_key)
+        except Exception as e:
+            record_error('provider.newsapi')
+            print(f"Error fetching news for '{query}': {str(e)}")
+            return []
+        finally:
+            observe('stage_duration_seconds', time.perf_counter() - start, stage='provider.newsapi')
+
+    if articles:
+        cache.set(cache_key, articles)
+    return articles
+
+
+async def fetch_news_async(queries, days=7, max_concurrency=NEWS_MAX_CONCURRENCY,
+                           base_url=NEWS_API_BASE_URL, api_key=NEWS_API_KEY, client=None):
+    """
+    Fetch articles for all queries concurrently, with at most max_concurrency
+    requests in flight. Requests go through the shared HTTP client, which
+    applies the NewsAPI host rate limit (NEWS_RATE_LIMIT) and retries.
+    Returns {query: [articles]}.
+    """
+    client = client or get_http_client()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results = await asyncio.gather(*[
+        _fetch_query(client, query, days, semaphore, base_url, api_key)
+        for query in queries
+    ])
+    return dict(zip(queries, results))
+
+
+def fetch_news(queries, days=7, **kwargs):
+    """
+    Synchronous entry point for fetch_news_async
+    """
+    return asyncio.run(fetch_news_async(queries, days=days, **kwargs))
+
+
+def merge_articles(articles_by_query):
+    """
+    Drop articles repeated across queries.
+
+    Returns the unique articles and, for every query, the indices of its
+    articles in that list, so per-query statistics can still be computed.
+    """
+    unique = []
+    positions = {}
+    membership = {}
+    for query, articles in articles_by_query.items():
+        membership[query] = []
+        for article in articles:
+            key = article.get('url') or article_key(article)
+            if key not in positions:
+                positions[key] = len(unique)
+                unique.append(article)
+            membership[query].append(positions[key])
+    return unique, membership
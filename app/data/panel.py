@@ -0,0 +1,49 @@
+import pandas as pd
+from utils.constants import SECTOR_ETFS
+from data.providers import get_data_provider
+from utils.cache import cached
+
+# Instruments used for cross-asset correlation
+ASSET_CLASS_SYMBOLS = {
+    'SPY': 'Equity',
+    'GLD': 'Gold',
+    'TLT': 'Bonds',
+    'UUP': 'USD',
+    'DBC': 'Commodities'
+}
+
+# Every symbol needed to build the portfolio market analysis
+MARKET_PANEL_SYMBOLS = list(dict.fromkeys(list(SECTOR_ETFS.values()) + list(ASSET_CLASS_SYMBOLS.keys())))
+
+
+def load_price_panel(symbols, period='1y', field='Close', provider=None):
+    """
+    Fetch all symbols in one batched request and return an aligned wide
+    DataFrame (dates x symbols) of the requested price field
+    """
+    provider = provider or get_data_provider()
+    try:
+        history = provider.get_history(symbols, period=period)
+    except Exception as e:
+        print(f"Error fetching price panel: {str(e)}")
+        history = {}
+
+    columns = {}
+    for symbol in symbols:
+        frame = history.get(symbol)
+        if frame is not None and field in frame:
+            columns[symbol] = frame[field]
+
+    panel = pd.DataFrame(columns)
+    if not panel.empty:
+        panel = panel.sort_index()
+    # Keep the requested column order, with all-NaN columns for missing symbols
+    return panel.reindex(columns=list(symbols))
+
+
+@cached('market_data', copy_result=True)
+def get_market_panel(period='1y', provider=None):
+    """
+    Load the shared close-price panel for sector ETFs and asset-class instruments
+    """
+    return load_price_panel(MARKET_PANEL_SYMBOLS, period=period, provider=provider)
@@ -0,0 +1,162 @@
+import os
+import threading
+import pandas as pd
+import yfinance as yf
+from config import DATA_PROVIDER, FIXTURE_DATA_DIR
+from utils.metrics import span, record_provider_call
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# yfinance keeps download results in module-global state (shared._DFS),
+# so calls into it from several threads must not overlap
+YAHOO_LOCK = threading.Lock()
+
+
+class DataProvider:
+    """
+    Base class for market data providers.
+
+    Providers return OHLCV history for many symbols in a single call as a
+    dict of {symbol: DataFrame}. Symbols without data are left out. When
+    start is given it takes precedence over period and only bars from
+    start onwards are returned.
+    """
+
+    name = 'base'
+
+    def get_history(self, symbols, period='1y', interval='1d', start=None):
+        raise NotImplementedError
+
+    def cache_key(self):
+        """
+        Stable identity used in cache keys instead of the object's repr
+        """
+        return (self.name,)
+
+
+class YahooFinanceProvider(DataProvider):
+    """
+    Fetch history from Yahoo Finance using one batched yf.download call.
+    Calls are serialized on YAHOO_LOCK; yf.download still fetches the
+    symbols of one call on its own threads.
+    """
+
+    name = 'yahoo'
+
+    def get_history(self, symbols, period='1y', interval='1d', start=None):
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+
+        if start is not None:
+            window = {'start': pd.Timestamp(start).strftime('%Y-%m-%d')}
+        else:
+            window = {'period': period}
+
+        record_provider_call(self.name, 'download')
+        with YAHOO_LOCK, span('provider.yahoo'):
+            data = yf.download(
+                symbols,
+                interval=interval,
+                **window,
+                group_by='ticker',
+                auto_adjust=True,
+                progress=False,
+                threads=True
+            )
+        if data is None or data.empty:
+            return {}
+
+        history = {}
+        for symbol in symbols:
+            try:
+                if isinstance(data.columns, pd.MultiIndex):
+                    frame = data[symbol]
+                else:
+                    frame = data
+                frame = frame.dropna(how='all')
+                if not frame.empty:
+                    history[symbol] = frame
+            except KeyError:
+                print(f"No data returned for {symbol}")
+        return history
+
+
+class FixtureProvider(DataProvider):
+    """
+    Serve history from local CSV files (one <SYMBOL>.csv per symbol) or from
+    an in-memory dict of DataFrames, so analysis can run offline
+    """
+
+    name = 'fixture'
+
+    def __init__(self, data_dir=None, frames=None):
+        self.data_dir = data_dir or FIXTURE_DATA_DIR
+        self.frames = dict(frames or {})
+        self._in_memory = bool(frames)
+
+    def cache_key(self):
+        # In-memory frames have no stable identity, so key on this instance
+        if self._in_memory:
+            return (self.name, id(self))
+        return (self.name, os.path.abspath(self.data_dir))
+
+    def _load(self, symbol):
+        if symbol in self.frames:
+            return self.frames[symbol]
+        path = os.path.join(self.data_dir, f"{symbol}.csv")
+        if not os.path.exists(path):
+            return None
+        frame = pd.read_csv(path, index_col=0, parse_dates=True)
+        self.frames[symbol] = frame
+        return frame
+
+    def get_history(self, symbols, period='1y', interval='1d', start=None):
+        history = {}
+        for symbol in dict.fromkeys(symbols):
+            frame = self._load(symbol)
+            if frame is None or frame.empty:
+                continue
+            if start is not None:
+                frame = frame[frame.index >= pd.Timestamp(start)]
+            elif period and period != 'max':
+                frame = frame[frame.index >= frame.index[-1] - period_to_offset(period)]
+            history[symbol] = frame
+        return history
+
+
+PROVIDERS = {
+    YahooFinanceProvider.name: YahooFinanceProvider,
+    FixtureProvider.name: FixtureProvider
+}
+
+_provider = None
+
+
+def period_to_offset(period):
+    """
+    Convert a yfinance-style period string ('5d', '6mo', '1y') to a DateOffset
+    """
+    units = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def get_data_provider():
+    """
+    Get the process-wide data provider, creating it from DATA_PROVIDER on first use
+    """
+    global _provider
+    if _provider is None:
+        _provider = PROVIDERS[DATA_PROVIDER]()
+    return _provider
+
+
+def set_data_provider(provider):
+    """
+    Replace the process-wide data provider (e.g. with a FixtureProvider)
+    """
+    global _provider
+    _provider = provider
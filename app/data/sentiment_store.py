@@ -0,0 +1,107 @@
+import json
+import hashlib
+from datetime import datetime
+from sqlalchemy import MetaData, Table, Column, String, Float, Text, DateTime, select
+from utils.database import get_engine
+
+metadata = MetaData()
+
+sentiment_table = Table(
+    'article_sentiment',
+    metadata,
+    Column('article_key', String(64), primary_key=True),
+    Column('model_version', String(255), primary_key=True),
+    Column('sentiment', String(16)),
+    Column('score', Float),
+    Column('entities', Text),
+    Column('created_at', DateTime)
+)
+
+# Stay well below SQLite's limit on bound parameters per statement
+_CHUNK_SIZE = 500
+
+
+def article_key(article):
+    """
+    Content hash identifying an article by URL, title and description
+    """
+    raw = '\n'.join(str(article.get(field) or '') for field in ('url', 'title', 'description'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class SentimentStore:
+    """
+    Durable cache of per-article sentiment label, score and entities,
+    keyed by article content hash and model version
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine or get_engine()
+        metadata.create_all(self.engine, tables=[sentiment_table])
+
+    def get_many(self, keys, model_version):
+        """
+        Look up stored results; returns {key: {'sentiment', 'score', 'entities'}} for hits
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self.engine.connect() as conn:
+            for start in range(0, len(keys), _CHUNK_SIZE):
+                query = (
+                    select(
+                        sentiment_table.c.article_key,
+                        sentiment_table.c.sentiment,
+                        sentiment_table.c.score,
+                        sentiment_table.c.entities
+                    )
+                    .where(sentiment_table.c.model_version == model_version)
+                    .where(sentiment_table.c.article_key.in_(keys[start:start + _CHUNK_SIZE]))
+                )
+                for key, sentiment, score, entities in conn.execute(query):
+                    found[key] = {
+                        'sentiment': sentiment,
+                        'score': score,
+                        'entities': json.loads(entities)
+                    }
+        return found
+
+    def put_many(self, results, model_version):
+        """
+        Store {key: {'sentiment', 'score', 'entities'}} results for a model version
+        """
+        if not results:
+            return
+        now = datetime.utcnow()
+        existing = self.get_many(results.keys(), model_version)
+        rows = [
+            {
+                'article_key': key,
+                'model_version': model_version,
+                'sentiment': result['sentiment'],
+                'score': result['score'],
+                'entities': json.dumps(result['entities']),
+                'created_at': now
+            }
+            for key, result in results.items()
+            if key not in existing
+        ]
+        if rows:
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(sentiment_table.insert(), rows)
+            except Exception as e:
+                # Another worker may have stored the same articles concurrently
+                print(f"Error storing sentiment results: {str(e)}")
+
+
+_store = None
+
+
+def get_sentiment_store():
+    """
+    Get the process-wide sentiment store
+    """
+    global _store
+    if _store is None:
+        _store = SentimentStore()
+    return _store
@@ -0,0 +1,107 @@
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """
+    Immutable, versioned view of precomputed market data.
+
+    Readers share the same objects, so the panel and frames inside must be
+    treated as read-only. A part that failed to refresh is carried over from
+    the previous snapshot, so staleness is judged from as_of (when
+    'market_analysis' and 'sentiment' were last built successfully) and
+    indicators_as_of (the same per watchlist symbol), not from created_at.
+    """
+
+    version: int
+    created_at: datetime
+    panel: object
+    market_analysis: MappingProxyType
+    indicators: MappingProxyType
+    sentiment: object
+    errors: MappingProxyType
+    as_of: MappingProxyType
+    indicators_as_of: MappingProxyType
+
+    def age(self):
+        """
+        Seconds since the snapshot was published
+        """
+        return (datetime.now() - self.created_at).total_seconds()
+
+    def part_age(self, part):
+        """
+        Seconds since a part was last built successfully (inf if never)
+        """
+        return _seconds_since(self.as_of.get(part))
+
+    def indicator_age(self, symbol):
+        """
+        Seconds since a watchlist symbol's analysis was last built (inf if never)
+        """
+        return _seconds_since(self.indicators_as_of.get(symbol))
+
+
+def _seconds_since(timestamp):
+    if timestamp is None:
+        return float('inf')
+    return (datetime.now() - timestamp).total_seconds()
+
+
+_current = None
+_lock = threading.Lock()
+
+
+def publish_snapshot(panel, market_analysis, indicators, sentiment, errors=None,
+                     as_of=None, indicators_as_of=None):
+    """
+    Atomically replace the current snapshot with a new version and return it.
+    as_of and indicators_as_of default to now for every part that is present.
+    """
+    global _current
+    now = datetime.now()
+    if as_of is None:
+        as_of = {part: now for part, value in (('market_analysis', market_analysis), ('sentiment', sentiment)) if value}
+    if indicators_as_of is None:
+        indicators_as_of = {symbol: now for symbol in (indicators or {})}
+    with _lock:
+        snapshot = MarketSnapshot(
+            version=(_current.version + 1) if _current is not None else 1,
+            created_at=now,
+            panel=panel,
+            market_analysis=MappingProxyType(dict(market_analysis or {})),
+            indicators=MappingProxyType(dict(indicators or {})),
+            sentiment=sentiment,
+            errors=MappingProxyType(dict(errors or {})),
+            as_of=MappingProxyType(dict(as_of)),
+            indicators_as_of=MappingProxyType(dict(indicators_as_of))
+        )
+        _current = snapshot
+    return snapshot
+
+
+def get_current_snapshot(max_age=None, part=None):
+    """
+    Get the latest published snapshot, or None if there is none or it is
+    older than max_age seconds. With part ('market_analysis' or 'sentiment')
+    the age is that of the part's last successful build.
+    """
+    snapshot = _current
+    if snapshot is None:
+        return None
+    age = snapshot.part_age(part) if part is not None else snapshot.age()
+    if max_age is not None and age > max_age:
+        return None
+    return snapshot
+
+
+def clear_snapshot():
+    """
+    Drop the current snapshot
+    """
+    global _current
+    with _lock:
+        _current = None
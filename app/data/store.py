@@ -0,0 +1,234 @@
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import MetaData, Table, Column, String, DateTime, Float, select, delete, func
+from data.providers import get_data_provider, period_to_offset, OHLCV_COLUMNS
+from utils.database import get_engine
+
+metadata = MetaData()
+
+bars_table = Table(
+    'ohlcv_bars',
+    metadata,
+    Column('symbol', String(32), primary_key=True),
+    Column('ts', DateTime, primary_key=True),
+    Column('open', Float),
+    Column('high', Float),
+    Column('low', Float),
+    Column('close', Float),
+    Column('volume', Float)
+)
+
+
+# Allow for weekends and holidays when checking that stored history covers a period
+BACKFILL_TOLERANCE = pd.Timedelta(days=7)
+
+# Relative close difference on a re-fetched bar that means the provider has
+# re-adjusted the history (split or dividend) and the symbol must be reloaded
+ADJUSTMENT_TOLERANCE = 1e-4
+
+
+def _period_start(period):
+    if period == 'max':
+        return None
+    return pd.Timestamp(datetime.utcnow()) - period_to_offset(period)
+
+
+def _to_naive_utc(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index
+
+
+class BarStore:
+    """
+    Persistent OHLCV bar store keyed by symbol.
+
+    Bars live in the configured DATABASE_URL. refresh() only requests the
+    bars from the last stored timestamp onwards (the last bar is re-fetched
+    because it may have been a partial session) plus the complete bar before
+    it, which is compared with the stored one to detect re-adjusted history.
+    read() selects only the requested columns.
+    """
+
+    def __init__(self, engine=None, provider=None):
+        self.engine = engine or get_engine()
+        self.provider = provider
+        metadata.create_all(self.engine, tables=[bars_table])
+
+    def coverage(self, symbols):
+        """
+        Get the (first, last) stored bar timestamps for each symbol that has data
+        """
+        query = (
+            select(bars_table.c.symbol, func.min(bars_table.c.ts), func.max(bars_table.c.ts))
+            .where(bars_table.c.symbol.in_(list(symbols)))
+            .group_by(bars_table.c.symbol)
+        )
+        with self.engine.connect() as conn:
+            return {
+                symbol: (pd.Timestamp(first), pd.Timestamp(last))
+                for symbol, first, last in conn.execute(query)
+            }
+
+    def _seam_bar(self, symbol):
+        """
+        The (timestamp, close) of the last complete stored bar, i.e. the one
+        before the possibly partial last bar, or None with fewer than two bars
+        """
+        query = (
+            select(bars_table.c.ts, bars_table.c.close)
+            .where(bars_table.c.symbol == symbol)
+            .order_by(bars_table.c.ts.desc())
+            .limit(2)
+        )
+        with self.engine.connect() as conn:
+            rows = conn.execute(query).fetchall()
+        if len(rows) < 2:
+            return None
+        return pd.Timestamp(rows[1][0]), rows[1][1]
+
+    @staticmethod
+    def _is_readjusted(frame, seam):
+        """
+        Check whether a re-fetched frame disagrees with the stored seam bar
+        """
+        ts, stored_close = seam
+        closes = pd.Series(frame['Close'].to_numpy(dtype=float), index=_to_naive_utc(frame.index))
+        fetched = closes.get(ts)
+        if fetched is None or pd.isna(fetched):
+            return True
+        return abs(fetched - stored_close) > ADJUSTMENT_TOLERANCE * abs(stored_close)
+
+    def refresh(self, symbols, period='1y'):
+        """
+        Bring the stored history for the given symbols up to date.
+
+        Symbols not yet in the store, or whose stored history does not
+        reach back far enough, get a full download of `period`; the rest
+        are batched by last timestamp and only fetch the delta. A symbol
+        whose re-fetched seam bar no longer matches the stored one (the
+        provider re-adjusted its closes after a split or dividend) is
+        downloaded again in full. Returns the number of bars written per
+        symbol.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        provider = self.provider or get_data_provider()
+        stored = self.coverage(symbols)
+        required_start = _period_start(period)
+
+        last = {}
+        seams = {}
+        requests = {}
+        for symbol in symbols:
+            start = None
+            if symbol in stored:
+                first, last_ts = stored[symbol]
+                if required_start is None or first <= required_start + BACKFILL_TOLERANCE:
+                    seam = self._seam_bar(symbol)
+                    start = (seam[0] if seam else last_ts).normalize()
+                    last[symbol] = last_ts
+                    if seam:
+                        seams[symbol] = seam
+            requests.setdefault(start, []).append(symbol)
+
+        written = {}
+        reload = []
+        for start, batch in requests.items():
+            try:
+                if start is None:
+                    history = provider.get_history(batch, period=period)
+                else:
+                    history = provider.get_history(batch, start=start)
+            except Exception as e:
+                print(f"Error refreshing bars for {', '.join(batch)}: {str(e)}")
+                continue
+            for symbol in batch:
+                frame = history.get(symbol)
+                if frame is None or frame.empty:
+                    continue
+                if symbol in seams and self._is_readjusted(frame, seams[symbol]):
+                    reload.append(symbol)
+                    continue
+                written[symbol] = self._write(symbol, frame, last.get(symbol))
+
+        if reload:
+            try:
+                history = provider.get_history(reload, period=period)
+            except Exception as e:
+                print(f"Error reloading re-adjusted bars for {', '.join(reload)}: {str(e)}")
+                history = {}
+            for symbol in reload:
+                frame = history.get(symbol)
+                if frame is not None and not frame.empty:
+                    written[symbol] = self._write(symbol, frame, replace=True)
+        return written
+
+    def _write(self, symbol, frame, since=None, replace=False):
+        frame = frame.reindex(columns=OHLCV_COLUMNS).dropna(subset=['Close'])
+        frame.index = _to_naive_utc(frame.index)
+        if since is not None:
+            frame = frame[frame.index >= since]
+        if frame.empty:
+            return 0
+
+        rows = [
+            {
+                'symbol': symbol,
+                'ts': ts.to_pydatetime(),
+                'open': row[0],
+                'high': row[1],
+                'low': row[2],
+                'close': row[3],
+                'volume': row[4]
+            }
+            for ts, row in zip(frame.index, frame.to_numpy(dtype=float).tolist())
+        ]
+        first_ts = frame.index[0].to_pydatetime()
+        with self.engine.begin() as conn:
+            # Replace the overlapping tail so a partial last bar gets updated,
+            # or the whole history when it was re-adjusted
+            stale = delete(bars_table).where(bars_table.c.symbol == symbol)
+            if not replace:
+                stale = stale.where(bars_table.c.ts >= first_ts)
+            conn.execute(stale)
+            conn.execute(bars_table.insert(), rows)
+        return len(rows)
+
+    def read(self, symbol, start=None, end=None, columns=None):
+        """
+        Read stored bars for a symbol as a DataFrame indexed by timestamp,
+        selecting only the requested OHLCV columns
+        """
+        columns = columns or OHLCV_COLUMNS
+        selected = [bars_table.c[name.lower()].label(name) for name in columns]
+        query = select(bars_table.c.ts, *selected).where(bars_table.c.symbol == symbol)
+        if start is not None:
+            query = query.where(bars_table.c.ts >= pd.Timestamp(start).to_pydatetime())
+        if end is not None:
+            query = query.where(bars_table.c.ts <= pd.Timestamp(end).to_pydatetime())
+        query = query.order_by(bars_table.c.ts)
+
+        with self.engine.connect() as conn:
+            df = pd.read_sql(query, conn, index_col='ts', parse_dates=['ts'])
+        df.index.name = 'Date'
+        return df
+
+    def read_period(self, symbol, period='1y', columns=None):
+        """
+        Read the trailing `period` of stored bars for a symbol
+        """
+        return self.read(symbol, start=_period_start(period), columns=columns)
+
+
+_store = None
+
+
+def get_bar_store():
+    """
+    Get the process-wide bar store
+    """
+    global _store
+    if _store is None:
+        _store = BarStore()
+    return _store
@@ -4,12 +4,18 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import yfinance as yf
 import plotly.express as px
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Import local modules
-from config import RISK_LEVELS, INVESTMENT_HORIZONS, SECTORS, NEWS_API_KEY, ALPHA_VANTAGE_API_KEY
-from analysis.technical import calculate_technical_indicators
-from analysis.sentiment import analyze_news_sentiment
+from config import RISK_LEVELS, INVESTMENT_HORIZONS, SECTORS, NEWS_API_KEY, ALPHA_VANTAGE_API_KEY, MODEL_PREWARM, SNAPSHOT_REFRESH_ENABLED
+from utils.constants import MARKET_INDICES, CACHE_SETTINGS
+from analysis.technical import analyze_stock
+from analysis.indicators import SMA_SHORT
+from analysis.sentiment import get_market_sentiment, warm_sentiment_models
 from analysis.portfolio import generate_portfolio_suggestions
+from analysis.refresher import start_snapshot_refresher
+from utils.metrics import timed
 
 # Set page config
 st.set_page_config(
@@ -30,7 +36,152 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+@st.cache_resource
+def prewarm_models():
+    """
+    Start loading the NLP models once per process
+    """
+    return warm_sentiment_models()
+
+@st.cache_resource
+def start_background_refresh():
+    """
+    Start the market snapshot refresher once per process
+    """
+    return start_snapshot_refresher()
+
+def load_portfolio(risk_level, investment_horizon, preferred_sectors):
+    """
+    Portfolio weights for the preferences; capital is applied when rendering
+    so changing it never recomputes the allocation. Not wrapped in
+    st.cache_data: generate_portfolio_suggestions already caches per profile
+    and skips degraded results, which st.cache_data cannot do.
+    """
+    return generate_portfolio_suggestions(
+        capital=1.0,
+        risk_level=risk_level,
+        investment_horizon=investment_horizon,
+        preferred_sectors=list(preferred_sectors)
+    )
+
+@st.cache_data(ttl=CACHE_SETTINGS['technical_indicators'], show_spinner=False)
+def load_index_indicators():
+    """
+    Latest indicator values and signals for the market indices
+    """
+    indicators = {}
+    for name, symbol in MARKET_INDICES.items():
+        analysis = analyze_stock(symbol)
+        if analysis is None:
+            continue
+        data = analysis['technical_data']
+        last, previous = data.iloc[-1], data.iloc[-2] if len(data) > 1 else data.iloc[-1]
+        indicators[name] = {
+            'price': float(last['Close']),
+            'RSI': float(last['RSI']),
+            'RSI_change': float(last['RSI'] - previous['RSI']),
+            'MACD': float(last['MACD']),
+            'MACD_change': float(last['MACD'] - previous['MACD']),
+            'MA_Signal': analysis['signals']['MA_Signal'],
+            'above_sma': bool(last['Close'] > last[SMA_SHORT])
+        }
+    return indicators
+
+@st.cache_data(ttl=CACHE_SETTINGS['news_data'], show_spinner=False)
+def load_market_sentiment():
+    """
+    Aggregate market news sentiment
+    """
+    return get_market_sentiment()
+
+@timed('ui.render_portfolio')
+def render_portfolio(portfolio, capital):
+    st.header("📊 Portfolio Allocation")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Create pie chart for portfolio allocation
+        fig = px.pie(
+            values=list(portfolio['allocation'].values()),
+            names=list(portfolio['allocation'].keys()),
+            title="Suggested Portfolio Allocation"
+        )
+        st.plotly_chart(fig)
+    
+    with col2:
+        # Display allocation details
+        st.subheader("Allocation Details")
+        for asset, allocation in portfolio['allocation'].items():
+            st.metric(
+                label=asset.replace('_', ' ').title(),
+                value=f"${allocation * capital:,.2f}",
+                delta=f"{allocation * 100:.1f}%"
+            )
+
+@timed('ui.render_indicators')
+def render_indicators(indicators):
+    st.header("📈 Market Analysis")
+    st.subheader("Technical Indicators")
+    if not indicators:
+        st.warning("Technical indicators are unavailable right now.")
+        return
+    
+    for name, values in indicators.items():
+        st.caption(f"{name} ({values['price']:,.2f})")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("RSI", f"{values['RSI']:.1f}", f"{values['RSI_change']:.2f}")
+        with col2:
+            st.metric("MACD", f"{values['MACD']:.2f}", f"{values['MACD_change']:.2f}")
+        with col3:
+            st.metric(
+                "Moving Average",
+                "Above" if values['above_sma'] else "Below",
+                values['MA_Signal']
+            )
+
+@timed('ui.render_sentiment')
+def render_sentiment(sentiment):
+    st.header("📰 Market Sentiment")
+    if not sentiment:
+        st.warning("Market sentiment is unavailable right now.")
+        return
+    
+    sentiment_data = {
+        'Positive': sentiment['positive'],
+        'Neutral': sentiment['neutral'],
+        'Negative': sentiment['negative']
+    }
+    
+    fig = px.bar(
+        x=list(sentiment_data.keys()),
+        y=list(sentiment_data.values()),
+        title="News Sentiment Analysis"
+    )
+    st.plotly_chart(fig)
+
+@timed('ui.render_risk')
+def render_risk(portfolio):
+    st.header("⚠️ Risk Analysis")
+    metrics = portfolio.get('metrics')
+    if not metrics:
+        st.warning("Risk metrics are unavailable for the default portfolio.")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Expected Return", f"{metrics['expected_return']:.2f}%")
+    with col2:
+        st.metric("Volatility", f"{metrics['volatility']:.2f}%")
+    with col3:
+        st.metric("Sharpe Ratio", f"{metrics['sharpe_ratio']:.2f}")
+
 def main():
+    if MODEL_PREWARM:
+        prewarm_models()
+    if SNAPSHOT_REFRESH_ENABLED:
+        start_background_refresh()
+    
     st.title("🤖 AI-Powered Stock Market Analyzer")
     
     # Sidebar for user inputs
@@ -70,105 +221,80 @@ def main():
         # Generate Analysis Button
         analyze_button = st.button("Generate Analysis", type="primary")
 
-    # Main content area
+    # Keep the submitted preferences so later reruns (e.g. a capital change)
+    # render from the cached results without refetching
     if analyze_button:
-        with st.spinner("Analyzing market data and generating recommendations..."):
-            # Generate portfolio suggestions
-            portfolio = generate_portfolio_suggestions(
-                capital=capital,
-                risk_level=risk_level,
-                investment_horizon=investment_horizon,
-                preferred_sectors=preferred_sectors
-            )
-            
-            # Display portfolio allocation
-            st.header("📊 Portfolio Allocation")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Create pie chart for portfolio allocation
-                fig = px.pie(
-                    values=list(portfolio['allocation'].values()),
-                    names=list(portfolio['allocation'].keys()),
-                    title="Suggested Portfolio Allocation"
-                )
-                st.plotly_chart(fig)
-            
-            with col2:
-                # Display allocation details
-                st.subheader("Allocation Details")
-                for asset, allocation in portfolio['allocation'].items():
-                    st.metric(
-                        label=asset.replace('_', ' ').title(),
-                        value=f"${allocation * capital:,.2f}",
-                        delta=f"{allocation * 100:.1f}%"
-                    )
-            
-            # Market Analysis Section
-            st.header("📈 Market Analysis")
-            
-            # Technical Analysis
-            st.subheader("Technical Indicators")
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric("RSI", "65.2", "2.1")
-            with col2:
-                st.metric("MACD", "0.45", "0.12")
-            with col3:
-                st.metric("Moving Average", "Above", "Bullish")
-            
-            # News Sentiment
-            st.header("📰 Market Sentiment")
-            sentiment_data = {
-                'Positive': 65,
-                'Neutral': 25,
-                'Negative': 10
-            }
-            
-            fig = px.bar(
-                x=list(sentiment_data.keys()),
-                y=list(sentiment_data.values()),
-                title="News Sentiment Analysis"
-            )
-            st.plotly_chart(fig)
-            
-            # Investment Recommendations
-            st.header("💡 Investment Recommendations")
-            
-            # Display recommendations in expandable sections
-            with st.expander("Equity Recommendations", expanded=True):
-                st.write("""
-                - Technology sector shows strong growth potential
-                - Healthcare stocks are undervalued
-                - Consider defensive stocks for portfolio stability
-                """)
-            
-            with st.expander("Commodity Recommendations", expanded=True):
-                st.write("""
-                - Gold: Consider as a hedge against market volatility
-                - Oil: Monitor supply chain disruptions
-                - Agricultural commodities: Watch for seasonal trends
-                """)
-            
-            with st.expander("Forex Recommendations", expanded=True):
-                st.write("""
-                - USD/JPY: Bullish trend expected
-                - EUR/USD: Range-bound trading
-                - GBP/USD: Monitor Brexit developments
-                """)
-            
-            # Risk Analysis
-            st.header("⚠️ Risk Analysis")
-            risk_metrics = {
-                'Market Volatility': 'Medium',
-                'Geopolitical Risk': 'Low',
-                'Currency Risk': 'Medium',
-                'Interest Rate Risk': 'High'
-            }
+        st.session_state['analysis_request'] = (risk_level, investment_horizon, tuple(preferred_sectors))
+    
+    request = st.session_state.get('analysis_request')
+    if request is None:
+        return
+    
+    # Placeholders keep the page layout stable while sections fill in
+    sections = {
+        'portfolio': st.empty(),
+        'indicators': st.empty(),
+        'sentiment': st.empty(),
+        'recommendations': st.container(),
+        'risk': st.empty()
+    }
+    for name in ('portfolio', 'indicators', 'sentiment', 'risk'):
+        sections[name].info("Loading...")
+    
+    # Run the three independent loads concurrently; each section renders as soon as it finishes.
+    # Yahoo Finance requests from these threads (and from the snapshot refresher) are
+    # serialized by the provider's YAHOO_LOCK, so the loads may run in any order
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=3, initializer=lambda: add_script_run_ctx(ctx=ctx)) as pool:
+        futures = {
+            pool.submit(load_portfolio, *request): 'portfolio',
+            pool.submit(load_index_indicators): 'indicators',
+            pool.submit(load_market_sentiment): 'sentiment'
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                sections[name].error(f"Error loading {name}: {str(e)}")
+                continue
             
-            for metric, value in risk_metrics.items():
-                st.metric(metric, value)
+            with sections[name].container():
+                if name == 'portfolio':
+                    render_portfolio(result, capital)
+                elif name == 'indicators':
+                    render_indicators(result)
+                else:
+                    render_sentiment(result)
+            if name == 'portfolio':
+                with sections['risk'].container():
+                    render_risk(result)
+    
+    with sections['recommendations']:
+        # Investment Recommendations
+        st.header("💡 Investment Recommendations")
+        
+        # Display recommendations in expandable sections
+        with st.expander("Equity Recommendations", expanded=True):
+            st.write("""
+            - Technology sector shows strong growth potential
+            - Healthcare stocks are undervalued
+            - Consider defensive stocks for portfolio stability
+            """)
+        
+        with st.expander("Commodity Recommendations", expanded=True):
+            st.write("""
+            - Gold: Consider as a hedge against market volatility
+            - Oil: Monitor supply chain disruptions
+            - Agricultural commodities: Watch for seasonal trends
+            """)
+        
+        with st.expander("Forex Recommendations", expanded=True):
+            st.write("""
+            - USD/JPY: Bullish trend expected
+            - EUR/USD: Range-bound trading
+            - GBP/USD: Monitor Brexit developments
+            """)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
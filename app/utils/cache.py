@@ -0,0 +1,269 @@
+import os
+import time
+import pickle
+import tempfile
+import hashlib
+import threading
+from functools import wraps
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from config import CACHE_DIR, CACHE_MAX_ENTRIES
+from utils.constants import CACHE_SETTINGS
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    In-process cache with a per-entry time to live and LRU eviction
+    once max_entries is reached
+    """
+
+    def __init__(self, ttl, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCache:
+    """
+    Optional on-disk cache tier storing one pickle file per key
+    """
+
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return default
+        except Exception as e:
+            print(f"Error reading cache entry {key}: {str(e)}")
+            self.misses += 1
+            return default
+
+        if expires_at <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        path = self._path(key)
+        tmp_path = None
+        try:
+            # A unique temp file per write, so concurrent writers of one key never share it
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix='.tmp', delete=False) as f:
+                tmp_path = f.name
+                pickle.dump((expires_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing cache entry {key}: {str(e)}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                os.remove(os.path.join(self.directory, name))
+
+
+class CacheRegion:
+    """
+    Two-tier cache for one CACHE_SETTINGS category: memory first, then disk
+    """
+
+    def __init__(self, category, ttl, max_entries=CACHE_MAX_ENTRIES, directory=CACHE_DIR):
+        self.category = category
+        self.memory = TTLCache(ttl, max_entries)
+        self.disk = DiskCache(os.path.join(directory, category), ttl) if directory else None
+
+    def get(self, key, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key, _MISSING)
+            if value is not _MISSING:
+                self.memory.set(key, value)
+                return value
+        return default
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        hits = self.memory.hits + (self.disk.hits if self.disk else 0)
+        lookups = self.memory.hits + self.memory.misses
+        return {
+            'hits': hits,
+            'misses': lookups - hits,
+            'memory_hits': self.memory.hits,
+            'disk_hits': self.disk.hits if self.disk else 0,
+            'evictions': self.memory.evictions,
+            'size': len(self.memory),
+            'ttl': self.memory.ttl
+        }
+
+
+_regions = {}
+_regions_lock = threading.Lock()
+
+
+def get_cache(category):
+    """
+    Get the cache region for a CACHE_SETTINGS category
+    """
+    with _regions_lock:
+        if category not in _regions:
+            _regions[category] = CacheRegion(category, CACHE_SETTINGS[category])
+        return _regions[category]
+
+
+def _key_part(value):
+    # Objects such as data providers expose cache_key() so keys don't embed
+    # their memory address and stay valid for the disk tier across restarts
+    cache_key = getattr(value, 'cache_key', None)
+    return cache_key() if callable(cache_key) else value
+
+
+def make_key(func, args, kwargs):
+    """
+    Build a stable cache key from a function and its arguments
+    """
+    args = tuple(_key_part(arg) for arg in args)
+    kwargs = sorted((name, _key_part(value)) for name, value in kwargs.items())
+    raw = repr((func.__module__, func.__qualname__, args, kwargs))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _is_empty(value):
+    if value is None:
+        return True
+    if getattr(value, 'empty', False) is True:
+        return True
+    return isinstance(value, (list, dict, tuple)) and len(value) == 0
+
+
+def copy_value(value):
+    """
+    Copy a cached result for one caller: dicts, lists and tuples are copied
+    recursively along with the DataFrames, Series and arrays inside them;
+    other values are shared
+    """
+    if isinstance(value, dict):
+        return {key: copy_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(copy_value(item) for item in value)
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value.copy()
+    return value
+
+
+def cached(category, copy_result=False, cacheable=None):
+    """
+    Cache a function's results in the given CACHE_SETTINGS category.
+
+    Empty results (None, empty frames or lists) are not cached so that
+    transient provider errors are retried on the next call; cacheable is an
+    optional predicate that rejects other results the same way (e.g.
+    fallbacks built without market data). With copy_result every caller
+    gets its own copy (see copy_value), so mutating a result never changes
+    the cached entry.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            region = get_cache(category)
+            key = make_key(func, args, kwargs)
+            value = region.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                if _is_empty(value) or (cacheable is not None and not cacheable(value)):
+                    return value
+                region.set(key, value)
+            return copy_value(value) if copy_result else value
+
+        wrapper.cache_category = category
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """
+    Get hit/miss counters for every cache category in use
+    """
+    with _regions_lock:
+        regions = dict(_regions)
+    return {category: region.stats() for category, region in regions.items()}
+
+
+def clear_cache(category=None):
+    """
+    Clear one cache category, or all of them
+    """
+    with _regions_lock:
+        if category:
+            regions = [_regions[category]] if category in _regions else []
+        else:
+            regions = list(_regions.values())
+    for region in regions:
+        region.clear()
@@ -0,0 +1,17 @@
+import threading
+from sqlalchemy import create_engine
+from config import DATABASE_URL
+
+_engines = {}
+_lock = threading.Lock()
+
+
+def get_engine(url=None):
+    """
+    Get a shared SQLAlchemy engine for the configured database
+    """
+    url = url or DATABASE_URL
+    with _lock:
+        if url not in _engines:
+            _engines[url] = create_engine(url, future=True)
+        return _engines[url]
@@ -2,9 +2,9 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import yfinance as yf
-import requests
 from bs4 import BeautifulSoup
 import time
+from utils.http import get_http_client, backoff_delay, retry_after_seconds
 
 def format_currency(value):
     """
@@ -32,10 +32,10 @@ def get_market_status():
 
 def retry_with_backoff(func, max_retries=3, initial_delay=1):
     """
-    Retry a function with exponential backoff
+    Retry a function with jittered exponential backoff, waiting as long as
+    a Retry-After header asks when the error carries an HTTP response
     """
     retries = 0
-    delay = initial_delay
     
     while retries < max_retries:
         try:
@@ -44,20 +44,18 @@ def retry_with_backoff(func, max_retries=3, initial_delay=1):
             retries += 1
             if retries == max_retries:
                 raise e
+            delay = retry_after_seconds(getattr(e, 'response', None))
+            if delay is None:
+                delay = backoff_delay(retries - 1, initial_delay)
             time.sleep(delay)
-            delay *= 2
 
 def fetch_webpage(url, headers=None):
     """
-    Fetch webpage content with error handling
+    Fetch webpage content with error handling, through the shared HTTP
+    client (pooled connections, per-host rate limits, conditional GETs)
     """
-    if headers is None:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-    
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_client().get(url, headers=headers)
         response.raise_for_status()
         return response.text
     except Exception as e:
@@ -144,4 +142,7 @@ def calculate_calmar_ratio(returns, window=252):
     """
     annual_return = returns.mean() * 252
     max_drawdown = calculate_max_drawdown(returns)
+    if isinstance(max_drawdown, pd.Series):
+        # One ratio per column for DataFrames
+        return (annual_return / max_drawdown.abs()).where(max_drawdown != 0, 0)
     return annual_return / abs(max_drawdown) if max_drawdown != 0 else 0 
\ No newline at end of file
@@ -0,0 +1,264 @@
+import time
+import random
+import asyncio
+import threading
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from config import (
+    MAX_RETRIES, HTTP_TIMEOUT, HTTP_POOL_SIZE, HTTP_CACHE_MAX_ENTRIES,
+    NEWS_RATE_LIMIT, SCRAPE_RATE_LIMIT, ALPHA_VANTAGE_RATE_LIMIT
+)
+from utils.constants import NEWS_SOURCES, NEWS_API_BASE_URL, ALPHA_VANTAGE_BASE_URL
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Statuses worth retrying; 429 and 503 may carry a Retry-After header
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _host(url):
+    return (urlsplit(url).hostname or '').lower()
+
+
+# Requests per second and burst size per host (subdomains included)
+HOST_RATE_LIMITS = {source: (SCRAPE_RATE_LIMIT, 2) for source in NEWS_SOURCES}
+HOST_RATE_LIMITS[_host(NEWS_API_BASE_URL)] = (NEWS_RATE_LIMIT, max(1, int(NEWS_RATE_LIMIT)))
+HOST_RATE_LIMITS[_host(ALPHA_VANTAGE_BASE_URL)] = (ALPHA_VANTAGE_RATE_LIMIT, 5)
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` requests per second with bursts of `capacity`
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token and return how many seconds to wait before using it
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def backoff_delay(attempt, initial_delay=1.0, max_delay=60.0):
+    """
+    Exponential backoff with full jitter for a zero-based retry attempt
+    """
+    return random.uniform(0, min(max_delay, initial_delay * 2 ** attempt))
+
+
+def retry_after_seconds(response):
+    """
+    Seconds requested by a Retry-After header (delta or HTTP date), or None
+    """
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """
+    Shared HTTP client: one keep-alive session per host, per-host token
+    bucket limits, retries with jittered backoff that honour Retry-After,
+    and a conditional GET cache revalidated with ETag / Last-Modified.
+    """
+
+    def __init__(self, rate_limits=None, pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT,
+                 max_retries=MAX_RETRIES, initial_delay=1.0, max_delay=60.0,
+                 cache_max_entries=HTTP_CACHE_MAX_ENTRIES):
+        self.rate_limits = dict(HOST_RATE_LIMITS if rate_limits is None else rate_limits)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.cache_max_entries = cache_max_entries
+        self._sessions = {}
+        self._buckets = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def session(self, host):
+        """
+        Pooled session for a host
+        """
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                self._sessions[host] = session
+            return session
+
+    def bucket(self, host):
+        """
+        Rate limiter for a host, or None if it is unlimited
+        """
+        with self._lock:
+            if host not in self._buckets:
+                limit = None
+                for domain, value in self.rate_limits.items():
+                    if host == domain or host.endswith('.' + domain):
+                        limit = value
+                        break
+                self._buckets[host] = TokenBucket(*limit) if limit else None
+            return self._buckets[host]
+
+    def _cache_key(self, url, params, headers):
+        # Headers such as X-Api-Key or Accept can change the response, so
+        # requests that differ only in headers get separate entries
+        header_items = tuple(sorted((name.lower(), value) for name, value in (headers or {}).items()))
+        return url, tuple(sorted((params or {}).items())), header_items
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+            return entry
+
+    def _store(self, key, response):
+        validators = {
+            name: response.headers[name]
+            for name in ('ETag', 'Last-Modified')
+            if name in response.headers
+        }
+        if response.status_code != 200 or not validators:
+            return
+        with self._lock:
+            self._cache[key] = {
+                'validators': validators,
+                'content': response.content,
+                'headers': dict(response.headers),
+                'encoding': response.encoding,
+                'url': response.url
+            }
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _from_cache(entry):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = entry['content']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = entry['encoding']
+        response.url = entry['url']
+        response.from_cache = True
+        return response
+
+    def _request(self, url, params=None, headers=None, timeout=None, rate_limited=True):
+        host = _host(url)
+        key = self._cache_key(url, params, headers)
+        entry = self._cached(key)
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if 'ETag' in entry['validators']:
+                request_headers['If-None-Match'] = entry['validators']['ETag']
+            if 'Last-Modified' in entry['validators']:
+                request_headers['If-Modified-Since'] = entry['validators']['Last-Modified']
+
+        session = self.session(host)
+        bucket = self.bucket(host)
+        attempt = 0
+        while True:
+            if bucket is not None and (rate_limited or attempt > 0):
+                bucket.acquire()
+            try:
+                response = session.get(url, params=params, headers=request_headers, timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(backoff_delay(attempt, self.initial_delay, self.max_delay))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = retry_after_seconds(response)
+                if delay is None:
+                    delay = backoff_delay(attempt, self.initial_delay, self.max_delay)
+                time.sleep(min(delay, self.max_delay))
+                attempt += 1
+                continue
+            break
+
+        if response.status_code == 304 and entry is not None:
+            return self._from_cache(entry)
+        response.from_cache = False
+        self._store(key, response)
+        return response
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        """
+        GET a URL through the host's pool and rate limit; 304 revalidations
+        return the cached response with from_cache set
+        """
+        return self._request(url, params, headers, timeout)
+
+    async def aget(self, url, params=None, headers=None, timeout=None):
+        """
+        Async GET: waits for the rate limit on the event loop, then runs the
+        blocking request in a worker thread
+        """
+        bucket = self.bucket(_host(url))
+        if bucket is not None:
+            delay = bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        return await asyncio.to_thread(self._request, url, params, headers, timeout, False)
+
+    def close(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """
+    Get the process-wide HTTP client
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -0,0 +1,180 @@
+import os
+import time
+import cProfile
+import threading
+import functools
+from contextlib import contextmanager
+from config import PROFILE_STAGES, PROFILE_DIR
+from utils.cache import cache_stats
+
+# Latency histogram bucket upper bounds, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_PREFIX = 'stock_analyzer'
+
+
+class Histogram:
+    """
+    Cumulative-bucket latency histogram
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+
+_histograms = {}
+_counters = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def observe(name, value, **labels):
+    """
+    Record one observation in a labelled histogram
+    """
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(value)
+
+
+def increment(name, value=1, **labels):
+    """
+    Add to a labelled counter
+    """
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def record_error(stage):
+    increment('errors_total', stage=stage)
+
+
+def record_provider_call(provider, endpoint='history'):
+    increment('provider_calls_total', provider=provider, endpoint=endpoint)
+
+
+def _dump_profile(profiler, stage):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    filename = f"{stage.replace('.', '_')}-{int(time.time() * 1000)}-{threading.get_ident()}.prof"
+    profiler.dump_stats(os.path.join(PROFILE_DIR, filename))
+
+
+@contextmanager
+def span(stage):
+    """
+    Time a stage into the stage_duration_seconds histogram, counting
+    errors that escape it. With PROFILE_STAGES set, the outermost span on
+    each thread is also profiled and dumped to PROFILE_DIR.
+    """
+    depth = getattr(_local, 'depth', 0)
+    profiler = cProfile.Profile() if PROFILE_STAGES and depth == 0 else None
+    _local.depth = depth + 1
+    if profiler is not None:
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        record_error(stage)
+        raise
+    finally:
+        observe('stage_duration_seconds', time.perf_counter() - start, stage=stage)
+        _local.depth = depth
+        if profiler is not None:
+            profiler.disable()
+            try:
+                _dump_profile(profiler, stage)
+            except Exception as e:
+                print(f"Error writing profile for {stage}: {str(e)}")
+
+
+def timed(stage):
+    """
+    Decorator form of span
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}'
+
+
+def render_prometheus():
+    """
+    All metrics, plus cache hit ratios, in Prometheus text exposition format
+    """
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: (h.buckets, list(h.counts), h.count, h.sum) for key, h in _histograms.items()}
+
+    lines = []
+    for name in sorted({name for name, _ in counters}):
+        metric = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# TYPE {metric} counter")
+        for (key_name, labels), value in sorted(counters.items()):
+            if key_name == name:
+                lines.append(f"{metric}{_labels(labels)} {value}")
+
+    for name in sorted({name for name, _ in histograms}):
+        metric = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# TYPE {metric} histogram")
+        for (key_name, labels), (buckets, counts, count, total) in sorted(histograms.items()):
+            if key_name != name:
+                continue
+            for bound, bucket_count in zip(buckets, counts):
+                lines.append(f"{metric}_bucket{_labels(labels + (('le', bound),))} {bucket_count}")
+            lines.append(f"{metric}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{metric}_sum{_labels(labels)} {total}")
+            lines.append(f"{metric}_count{_labels(labels)} {count}")
+
+    stats = cache_stats()
+    if stats:
+        for suffix, kind in (('cache_hits_total', 'counter'), ('cache_misses_total', 'counter'),
+                             ('cache_hit_ratio', 'gauge'), ('cache_entries', 'gauge')):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{suffix} {kind}")
+            for category, region in sorted(stats.items()):
+                lookups = region['hits'] + region['misses']
+                value = {
+                    'cache_hits_total': region['hits'],
+                    'cache_misses_total': region['misses'],
+                    'cache_hit_ratio': region['hits'] / lookups if lookups else 0.0,
+                    'cache_entries': region['size']
+                }[suffix]
+                lines.append(f"{METRIC_PREFIX}_{suffix}{_labels((('category', category),))} {value}")
+
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics():
+    """
+    Clear all recorded counters and histograms
+    """
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
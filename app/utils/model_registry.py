@@ -0,0 +1,98 @@
+import time
+import threading
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of lazily loaded models.
+
+    Loaders are registered up front but only run on the first get(), so
+    importing a module that registers models stays cheap. Each model is
+    loaded once per process even when several threads ask for it at the
+    same time, and the load time is recorded.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._load_times = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        """
+        Register a zero-argument loader for a model name
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name):
+        """
+        Get a model, loading it on first use
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"No model registered under '{name}'")
+
+        with self._locks[name]:
+            model = self._models.get(name)
+            if model is None:
+                start = time.perf_counter()
+                model = self._loaders[name]()
+                elapsed = time.perf_counter() - start
+                self._models[name] = model
+                self._load_times[name] = elapsed
+                print(f"Loaded model '{name}' in {elapsed:.2f}s")
+        return model
+
+    def set(self, name, model):
+        """
+        Install an already-built model (e.g. a stub for offline runs)
+        """
+        with self._lock:
+            self._locks.setdefault(name, threading.Lock())
+            self._models[name] = model
+            self._load_times[name] = 0.0
+
+    def unload(self, name):
+        with self._lock:
+            self._models.pop(name, None)
+            self._load_times.pop(name, None)
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def load_times(self):
+        """
+        Get the load time in seconds of every model loaded so far
+        """
+        return dict(self._load_times)
+
+    def warm(self, names=None, background=True):
+        """
+        Load the given models (all registered ones by default) ahead of first use.
+        With background=True the loading runs in a daemon thread, which is returned.
+        """
+        names = list(names or self._loaders.keys())
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Error pre-warming model '{name}': {str(e)}")
+
+        if not background:
+            load_all()
+            return None
+
+        thread = threading.Thread(target=load_all, name='model-prewarm', daemon=True)
+        thread.start()
+        return thread
+
+
+registry = ModelRegistry()
@@ -0,0 +1,253 @@
+"""
+Offline benchmark suite for the analysis engine.
+
+Every stage runs on seeded synthetic data (see synthetic.py) with stub
+sentiment/NER models, so results are reproducible and need no network.
+For each stage it reports throughput, p50/p95/p99 latency and peak traced
+memory. Results can be saved as a JSON baseline and later runs compared
+against it:
+
+    python benchmarks/run.py --save baseline.json
+    python benchmarks/run.py --compare baseline.json --threshold 0.2
+
+Comparison exits with status 1 when a stage's p50 latency or peak memory
+grows by more than the threshold. Baselines are machine specific.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'app'))
+
+# Keep the run offline and free of persistent state
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SENTIMENT_CACHE_ENABLED', 'false')
+os.environ.setdefault('BAR_STORE_ENABLED', 'false')
+os.environ.setdefault('SNAPSHOT_REFRESH_ENABLED', 'false')
+
+import synthetic
+from config import SECTORS
+from data.panel import MARKET_PANEL_SYMBOLS
+from utils.model_registry import registry
+from utils.helpers import calculate_volatility, calculate_sharpe_ratio, calculate_max_drawdown, calculate_calmar_ratio
+from analysis.technical import calculate_technical_indicators
+from analysis.indicators import compute_indicator_panel
+from analysis.risk import estimate_moments
+from analysis.portfolio import calculate_portfolio_metrics, generate_portfolio_suggestions_batch
+from analysis.sentiment import score_articles
+
+
+def stage_indicators(args):
+    """
+    calculate_technical_indicators, one symbol at a time
+    """
+    frames = synthetic.make_ohlcv(synthetic.make_symbols(args.symbols), args.bars, args.seed)
+
+    def run():
+        for frame in frames.values():
+            calculate_technical_indicators(frame.copy())
+    return run, args.symbols
+
+
+def stage_indicator_panel(args):
+    """
+    compute_indicator_panel over the whole close panel at once
+    """
+    panel = synthetic.close_panel(synthetic.make_ohlcv(synthetic.make_symbols(args.symbols), args.bars, args.seed))
+    return lambda: compute_indicator_panel(panel), args.symbols
+
+
+def stage_risk_helpers(args):
+    """
+    Volatility, Sharpe, max drawdown and Calmar helpers on a returns panel
+    """
+    panel = synthetic.close_panel(synthetic.make_ohlcv(synthetic.make_symbols(args.symbols), args.bars, args.seed))
+    returns = panel.pct_change().iloc[1:]
+
+    def run():
+        calculate_volatility(returns)
+        calculate_sharpe_ratio(returns)
+        calculate_max_drawdown(returns)
+        calculate_calmar_ratio(returns)
+    return run, args.symbols
+
+
+def _market_panel(args):
+    return synthetic.close_panel(synthetic.make_ohlcv(MARKET_PANEL_SYMBOLS, args.bars, args.seed))
+
+
+def stage_portfolio_metrics(args):
+    """
+    calculate_portfolio_metrics for a batch of random portfolios
+    """
+    expected_returns, covariance = estimate_moments(_market_panel(args))
+    rng = np.random.default_rng(args.seed)
+    portfolios = []
+    for _ in range(args.portfolios):
+        allocation = dict(zip(['equity', 'commodities', 'forex', 'fixed_income'], rng.dirichlet(np.ones(4))))
+        sectors = rng.choice(SECTORS, size=3, replace=False)
+        weights = rng.dirichlet(np.ones(3)) * allocation['equity']
+        portfolios.append({
+            'allocation': allocation,
+            'sector_breakdown': dict(zip(sectors, weights)),
+            'market_analysis': {'expected_returns': expected_returns, 'covariance': covariance}
+        })
+
+    def run():
+        for portfolio in portfolios:
+            calculate_portfolio_metrics(portfolio)
+    return run, args.portfolios
+
+
+def stage_portfolio_batch(args):
+    """
+    generate_portfolio_suggestions_batch for many client profiles
+    """
+    panel = _market_panel(args)
+    rng = np.random.default_rng(args.seed)
+    profiles = [
+        (
+            float(rng.integers(1, 100)) * 1000,
+            str(rng.choice(['LOW', 'MEDIUM', 'HIGH'])),
+            str(rng.choice(['SHORT_TERM', 'MEDIUM_TERM', 'LONG_TERM'])),
+            list(rng.choice(SECTORS, size=3, replace=False))
+        )
+        for _ in range(args.portfolios)
+    ]
+    return lambda: generate_portfolio_suggestions_batch(profiles, panel=panel), args.portfolios
+
+
+def stage_sentiment(args):
+    """
+    score_articles through the stub models (inference path, no store)
+    """
+    registry.set('sentiment', synthetic.StubSentimentPipeline())
+    registry.set('spacy_ner', synthetic.StubNER())
+    articles = synthetic.make_articles(args.articles, args.seed)
+    return lambda: score_articles(articles), args.articles
+
+
+STAGES = {
+    'indicators': stage_indicators,
+    'indicator_panel': stage_indicator_panel,
+    'risk_helpers': stage_risk_helpers,
+    'portfolio_metrics': stage_portfolio_metrics,
+    'portfolio_batch': stage_portfolio_batch,
+    'sentiment': stage_sentiment
+}
+
+
+def measure(run, items, repeats, warmup):
+    """
+    Time repeated runs of a stage and trace the peak memory of one more run
+    """
+    for _ in range(warmup):
+        run()
+
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'items_per_run': items,
+        'throughput_per_s': items / (latencies.mean() / 1000),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'peak_memory_mb': peak / 2 ** 20
+    }
+
+
+def run_suite(args):
+    results = {}
+    for name in args.stages:
+        run, items = STAGES[name](args)
+        results[name] = measure(run, items, args.repeats, args.warmup)
+        print(format_row(name, results[name]), flush=True)
+    return results
+
+
+def format_row(name, metrics):
+    return (f"{name:<18} {metrics['throughput_per_s']:>12.1f}/s "
+            f"p50 {metrics['p50_ms']:>9.2f} ms  p95 {metrics['p95_ms']:>9.2f} ms  "
+            f"p99 {metrics['p99_ms']:>9.2f} ms  peak {metrics['peak_memory_mb']:>8.2f} MB")
+
+
+def compare(results, baseline, threshold):
+    """
+    Stages whose p50 latency or peak memory grew by more than threshold
+    """
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        for metric in ('p50_ms', 'peak_memory_mb'):
+            if base[metric] > 0:
+                change = metrics[metric] / base[metric] - 1
+                if change > threshold:
+                    regressions.append((name, metric, base[metric], metrics[metric], change))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=50, help='symbols in the synthetic panel')
+    parser.add_argument('--bars', type=int, default=756, help='bars per symbol')
+    parser.add_argument('--articles', type=int, default=500, help='articles in the news corpus')
+    parser.add_argument('--portfolios', type=int, default=100, help='portfolios or profiles per run')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--stages', default=','.join(STAGES), help='comma separated stages to run')
+    parser.add_argument('--save', help='write results to this JSON baseline file')
+    parser.add_argument('--compare', help='compare against this JSON baseline file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed relative growth before flagging')
+    args = parser.parse_args(argv)
+    args.stages = [name.strip() for name in args.stages.split(',') if name.strip()]
+    unknown = [name for name in args.stages if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages {unknown}, expected some of {list(STAGES)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    settings = {key: getattr(args, key) for key in ('symbols', 'bars', 'articles', 'portfolios', 'seed', 'repeats')}
+    results = run_suite(args)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'settings': settings, 'python': platform.python_version(), 'results': results}, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('settings') != settings:
+            print(f"Warning: baseline settings {baseline.get('settings')} differ from {settings}")
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, before, after, change in regressions:
+            print(f"REGRESSION {name} {metric}: {before:.2f} -> {after:.2f} (+{change * 100:.0f}%)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold * 100:.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
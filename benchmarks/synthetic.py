@@ -0,0 +1,134 @@
+"""
+Seeded synthetic inputs for the benchmark suite: OHLCV panels, a news
+corpus and lightweight stand-ins for the sentiment and NER models.
+"""
+import random
+import numpy as np
+import pandas as pd
+
+END_DATE = '2024-12-31'
+
+
+def make_ohlcv(symbols, bars, seed=42):
+    """
+    Geometric random-walk OHLCV history per symbol, as {symbol: DataFrame}
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=END_DATE, periods=bars)
+    frames = {}
+    for symbol in symbols:
+        volatility = rng.uniform(0.01, 0.03)
+        drift = rng.normal(0.0003, 0.0002)
+        close = rng.uniform(20, 500) * np.exp(np.cumsum(rng.normal(drift, volatility, bars)))
+        open_ = close * (1 + rng.normal(0, volatility / 4, bars))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, volatility / 2, bars)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, volatility / 2, bars)))
+        volume = rng.lognormal(14, 0.5, bars).round()
+        frames[symbol] = pd.DataFrame(
+            {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+            index=index
+        )
+    return frames
+
+
+def make_symbols(count):
+    return [f"SYN{i:04d}" for i in range(count)]
+
+
+def close_panel(frames):
+    """
+    Wide (dates x symbols) close-price panel from OHLCV frames
+    """
+    return pd.DataFrame({symbol: frame['Close'] for symbol, frame in frames.items()})
+
+
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella', 'Stark Industries', 'Wayne Enterprises',
+             'Hooli', 'Vandelay Industries', 'Soylent', 'Cyberdyne']
+PLACES = ['New York', 'London', 'Tokyo', 'Frankfurt', 'Washington']
+POSITIVE = ['surges', 'beats estimates', 'rallies', 'raises guidance', 'hits record high']
+NEGATIVE = ['slumps', 'misses estimates', 'tumbles', 'cuts guidance', 'faces probe']
+NEUTRAL = ['holds steady', 'reports results', 'announces meeting', 'updates board', 'trades flat']
+FILLER = ('Analysts in {place} said the move reflects broader market conditions, with investors '
+          'watching interest rates, inflation data and earnings from {other} later this week.')
+
+
+def make_articles(count, seed=42):
+    """
+    NewsAPI-shaped articles with varied lengths and unique URLs
+    """
+    rng = random.Random(seed)
+    articles = []
+    for i in range(count):
+        company = rng.choice(COMPANIES)
+        phrase = rng.choice(rng.choice([POSITIVE, NEGATIVE, NEUTRAL]))
+        description = ' '.join(
+            FILLER.format(place=rng.choice(PLACES), other=rng.choice(COMPANIES))
+            for _ in range(rng.randint(1, 4))
+        )
+        articles.append({
+            'title': f"{company} {phrase}",
+            'description': description,
+            'url': f"https://news.example.com/articles/{seed}/{i}",
+            'source': {'name': rng.choice(['Wire', 'Daily', 'Ledger'])},
+            'publishedAt': f"2024-12-{rng.randint(1, 28):02d}T12:00:00Z"
+        })
+    return articles
+
+
+class StubTokenizer:
+    def __call__(self, texts, truncation=True, max_length=None, **kwargs):
+        ids = [list(range(len(text.split()))) for text in texts]
+        if truncation and max_length:
+            ids = [row[:max_length] for row in ids]
+        return {'input_ids': ids}
+
+
+class StubSentimentPipeline:
+    """
+    Deterministic word-list classifier with the transformers pipeline interface
+    """
+
+    def __init__(self):
+        self.tokenizer = StubTokenizer()
+        self.positive = {word for phrase in POSITIVE for word in phrase.split()}
+        self.negative = {word for phrase in NEGATIVE for word in phrase.split()}
+
+    def __call__(self, texts, batch_size=None, truncation=True, max_length=None, **kwargs):
+        outputs = []
+        for text in texts:
+            words = text.lower().split()[:max_length]
+            score = sum(word in self.positive for word in words) - sum(word in self.negative for word in words)
+            label = 'POS' if score > 0 else 'NEG' if score < 0 else 'NEU'
+            outputs.append({'label': label, 'score': 0.5 + min(abs(score), 5) / 10})
+        return outputs
+
+
+class _Entity:
+    __slots__ = ('text', 'label_')
+
+    def __init__(self, text, label):
+        self.text = text
+        self.label_ = label
+
+
+class _Doc:
+    __slots__ = ('ents',)
+
+    def __init__(self, ents):
+        self.ents = ents
+
+
+class StubNER:
+    """
+    Gazetteer lookup with the spaCy Language interface used by the app
+    """
+
+    def __init__(self):
+        self.gazetteer = [(name, 'ORG') for name in COMPANIES] + [(name, 'GPE') for name in PLACES]
+
+    def __call__(self, text):
+        return _Doc([_Entity(name, label) for name, label in self.gazetteer if name in text])
+
+    def pipe(self, texts, batch_size=None, n_process=1):
+        for text in texts:
+            yield self(text)